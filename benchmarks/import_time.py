@@ -0,0 +1,108 @@
+"""
+Cold-start import benchmark.
+
+Times the module-level imports of dashboard.py and each page in a fresh
+interpreter (what a cold container pays before the first render). Fails
+if a script goes over its time budget or loads one of the heavy
+dependencies that must stay lazy.
+
+    python benchmarks/import_time.py             # table + budget check
+    python benchmarks/import_time.py --top 10    # also list the slowest modules
+"""
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ["dashboard.py", *sorted(str(p.relative_to(ROOT)) for p in (ROOT / "pages").glob("*.py"))]
+
+# Milliseconds of module-level imports allowed per script. Streamlit and
+# pandas alone are ~750ms here, and timings are noisy, so the budget is
+# loose; LAZY_MODULES is the precise check.
+BUDGET_MS = {
+    "dashboard.py": 1500,
+    "pages/calendar.py": 1500,
+    "pages/city_pulse.py": 1500,
+    "pages/stock_market_dashboard.py": 1500,
+}
+DEFAULT_BUDGET_MS = 1500
+# Heavy modules (~200-450ms each) that may only be imported where used.
+# (plotly.graph_objects isn't listed: streamlit itself imports it.)
+LAZY_MODULES = ["yfinance", "investpy", "plotly.express"]
+RUNS = 3
+
+
+def module_level_imports(script):
+    """Source of every top-level import statement in script."""
+    tree = ast.parse((ROOT / script).read_text())
+    return [
+        ast.get_source_segment((ROOT / script).read_text(), node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def time_imports(imports):
+    """
+    Best-of-RUNS wall time (ms) to run imports in a fresh interpreter,
+    and which LAZY_MODULES they pulled in.
+    """
+    code = "\n".join([
+        "import sys, time",
+        "_t = time.perf_counter()",
+        *imports,
+        "_ms = (time.perf_counter() - _t) * 1000",
+        f"print(_ms, ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules), sep=';')",
+    ])
+    timings = []
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        elapsed, loaded = out.stdout.strip().splitlines()[-1].split(";")
+        timings.append(float(elapsed))
+    return min(timings), [m for m in loaded.split(",") if m]
+
+
+def slowest_modules(imports, top):
+    """(cumulative ms, module) for the slowest top-level modules via -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(imports)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest top-level modules")
+    args = parser.parse_args(argv)
+
+    failed = []
+    print(f"{'script':<36}{'import ms':>10}{'budget':>8}")
+    for script in SCRIPTS:
+        imports = module_level_imports(script)
+        elapsed, loaded = time_imports(imports)
+        budget = BUDGET_MS.get(script, DEFAULT_BUDGET_MS)
+        flag = "" if elapsed <= budget else "  OVER"
+        if loaded:
+            flag += f"  eagerly loads {', '.join(loaded)}"
+        print(f"{script:<36}{elapsed:>10.0f}{budget:>8}{flag}")
+        if flag:
+            failed.append(script)
+        if args.top:
+            for ms, name in slowest_modules(imports, args.top):
+                print(f"    {ms:>8.0f} ms  {name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
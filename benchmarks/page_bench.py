@@ -0,0 +1,280 @@
+"""
+Page render benchmark with replayed upstream fixtures.
+
+Runs dashboard.py and every page headlessly with Streamlit's AppTest. All
+upstream traffic is served from benchmarks/fixtures: FRED, NewsAPI,
+alternative.me and OpenFEMA through a patched requests transport, and
+yfinance and investpy at their library boundary. For each page it reports
+wall time, peak Python memory and upstream calls per service, for a cold
+start (empty local store) and for warm reruns. A new uncached loop shows
+up as a jump in calls or time before it ships.
+
+    python benchmarks/page_bench.py
+    python benchmarks/page_bench.py --runs 5 --json results.json
+    python benchmarks/page_bench.py --page pages/city_pulse.py --no-memory
+
+Each page runs in its own interpreter with its own temporary store, so
+pages don't warm each other's caches.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+PAGES = ["dashboard.py", *sorted(str(p.relative_to(ROOT)) for p in (ROOT / "pages").glob("*.py"))]
+
+
+def load_fixture(name):
+    with open(FIXTURES / f"{name}.json") as f:
+        return json.load(f)
+
+
+# --- HTTP replay (requests) ---
+
+def fred_response(params, fixture):
+    entry = next(e for e in fixture["entries"] if e["match"].items() <= params.items())
+    observations = [o for o in entry["observations"] if o["date"] >= params.get("observation_start", "")]
+    if params.get("sort_order") == "desc":
+        observations = observations[::-1]
+    if "limit" in params:
+        observations = observations[:int(params["limit"])]
+    return {"count": len(observations), "observations": observations}
+
+
+def fng_response(params, fixture):
+    limit = int(params.get("limit", 1))
+    return {"name": fixture["name"], "data": fixture["data"][:limit] if limit else fixture["data"]}
+
+
+def fema_response(params, fixture):
+    filt = params.get("$filter", "")
+    since = re.search(r"declarationDate ge '([^']+)'", filt)
+    states = re.search(r"state in \(([^)]*)\)", filt)
+    records = fixture["DisasterDeclarationsSummaries"]
+    if since:
+        records = [r for r in records if r["declarationDate"][:10] >= since.group(1)[:10]]
+    if states:
+        wanted = {s.strip(" '") for s in states.group(1).split(",")}
+        records = [r for r in records if r["state"] in wanted]
+    records = sorted(records, key=lambda r: (r["declarationDate"], r["id"]))
+    skip = int(params.get("$skip", 0))
+    top = int(params.get("$top", 1000))
+    return {"DisasterDeclarationsSummaries": records[skip:skip + top]}
+
+
+def news_response(params, fixture):
+    return {k: v for k, v in fixture.items() if k != "_doc"}
+
+
+# host -> (service name, fixture name, responder)
+HTTP_ROUTES = {
+    "api.stlouisfed.org": ("fred", "fred", fred_response),
+    "api.alternative.me": ("fear_greed", "fear_greed", fng_response),
+    "www.fema.gov": ("fema", "fema", fema_response),
+    "newsapi.org": ("newsapi", "newsapi", news_response),
+}
+
+
+def install_http_stub(calls):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    fixtures = {}
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        params = dict(parse_qsl(url.query))
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        route = HTTP_ROUTES.get(url.hostname)
+        if route is None:
+            calls[f"unknown:{url.hostname}"] += 1
+            response.status_code = 404
+            response._content = b"{}"
+            return response
+        service, fixture_name, respond = route
+        calls[service] += 1
+        if fixture_name not in fixtures:
+            fixtures[fixture_name] = load_fixture(fixture_name)
+        response.status_code = 200
+        response._content = json.dumps(respond(params, fixtures[fixture_name])).encode()
+        return response
+
+    HTTPAdapter.send = send
+
+
+# --- Library replay (yfinance, investpy) ---
+
+def install_yfinance_stub(calls):
+    import pandas as pd
+    try:
+        import yfinance
+    except ImportError:
+        yfinance = sys.modules["yfinance"] = types.ModuleType("yfinance")
+
+    fixture = load_fixture("yfinance")
+    origin, today = pd.Timestamp("2015-01-01"), pd.Timestamp(date.today())
+    days = pd.bdate_range(origin, today)
+    closes = {}
+    for ticker, spec in fixture["tickers"].items():
+        rng = random.Random(f"{fixture['seed']}:{ticker}")
+        price, path = spec["start_price"], []
+        for _ in days:
+            price *= 1 + rng.gauss(0, spec["daily_vol"])
+            path.append(price)
+        closes[ticker] = pd.Series(path, index=days)
+
+    def download(tickers, start=None, end=None, period=None, auto_adjust=True, **kwargs):
+        calls["yfinance"] += 1
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        if period:
+            index = days[-int(period.rstrip("d")):]
+        else:
+            index = days[(days >= pd.Timestamp(start)) & (days < pd.Timestamp(end))]
+        fields = ["Close", "High", "Low", "Open", "Volume"] + ([] if auto_adjust else ["Adj Close"])
+        frame = {}
+        for field in fields:
+            for ticker in tickers:
+                close = closes.get(ticker, pd.Series(dtype=float)).reindex(index)
+                frame[(field, ticker)] = close * 1e6 if field == "Volume" else close
+        columns = pd.MultiIndex.from_tuples(frame, names=["Price", "Ticker"])
+        return pd.DataFrame(frame, index=index.rename("Date"), columns=columns)
+
+    class WebSocket:
+        # No streaming in replay: quote snapshots fall back to polling
+        def __init__(self, *args, **kwargs):
+            raise ConnectionError("websocket not available in replay")
+
+    yfinance.download = download
+    yfinance.WebSocket = WebSocket
+
+
+def install_investpy_stub(calls):
+    import calendar
+    import pandas as pd
+    try:
+        import investpy
+    except ImportError:
+        investpy = sys.modules["investpy"] = types.ModuleType("investpy")
+
+    fixture = load_fixture("investpy")
+
+    def economic_calendar(from_date, to_date, countries=None, importances=None, **kwargs):
+        calls["investpy"] += 1
+        start = datetime.strptime(from_date, "%d/%m/%Y")
+        month_days = calendar.monthrange(start.year, start.month)[1]
+        rows = [
+            {"id": i, "date": f"{e['day']:02d}/{start.month:02d}/{start.year}", **{k: v for k, v in e.items() if k != "day"}}
+            for i, e in enumerate(fixture["events"])
+            if e["day"] <= month_days and (not importances or e["importance"] in importances)
+        ]
+        return pd.DataFrame(rows)
+
+    investpy.economic_calendar = economic_calendar
+
+
+# --- Runner ---
+
+def run_page(page, runs, memory):
+    """Child process: render page once cold and `runs` times warm; print JSON results."""
+    cache_dir = tempfile.mkdtemp(prefix="page-bench-")
+    os.environ["DASHBOARD_CACHE_DIR"] = cache_dir
+    os.environ.pop("DASHBOARD_READ_ONLY", None)
+    os.environ["DASHBOARD_METRICS_PORT"] = "0"
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    calls = Counter()
+    install_http_stub(calls)
+    install_yfinance_stub(calls)
+    install_investpy_stub(calls)
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    try:
+        for i in range(runs + 1):
+            at = AppTest.from_file(str(ROOT / page), default_timeout=120)
+            at.secrets["FRED_API_KEY"] = "bench"
+            at.secrets["NEWS_API_KEY"] = "bench"
+            calls.clear()
+            if memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            at.run()
+            wall_ms = (time.perf_counter() - started) * 1000
+            peak_mib = tracemalloc.get_traced_memory()[1] / 2**20 if memory else None
+            if memory:
+                tracemalloc.stop()
+            results.append({
+                "page": page,
+                "run": "cold" if i == 0 else f"warm{i}",
+                "wall_ms": round(wall_ms, 1),
+                "peak_mib": round(peak_mib, 1) if memory else None,
+                "upstream_calls": dict(calls),
+                "exceptions": [str(e.value) for e in at.exception],
+            })
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(json.dumps(results))
+
+
+def format_row(r):
+    calls = " ".join(f"{k}={v}" for k, v in sorted(r["upstream_calls"].items())) or "-"
+    peak = f"{r['peak_mib']:.1f}" if r["peak_mib"] is not None else "-"
+    flag = "  EXCEPTION" if r["exceptions"] else ""
+    return f"{r['page']:<34}{r['run']:<7}{r['wall_ms']:>9.0f}{peak:>9}  {calls}{flag}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Page render benchmark with replayed upstream fixtures")
+    parser.add_argument("--page", action="append", choices=PAGES, help="page(s) to run (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="warm reruns after the cold run")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows rendering)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--child", metavar="PAGE", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_page(args.child, args.runs, not args.no_memory)
+        return 0
+
+    results = []
+    print(f"{'page':<34}{'run':<7}{'wall ms':>9}{'peak MiB':>9}  upstream calls")
+    for page in args.page or PAGES:
+        cmd = [sys.executable, __file__, "--child", page, "--runs", str(args.runs)]
+        if args.no_memory:
+            cmd.append("--no-memory")
+        out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{page}: benchmark failed\n{out.stderr}", file=sys.stderr)
+            return 1
+        page_results = json.loads(out.stdout.strip().splitlines()[-1])
+        for r in page_results:
+            print(format_row(r))
+        results.extend(page_results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r["exceptions"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,13 @@
 
 import streamlit as st
 import pandas as pd
-import requests
 import plotly.graph_objects as go
-import yfinance as yf
 from datetime import datetime
 
+from utils import catalog, derived, fear_greed, metrics, series_store
+
+render_timer = metrics.start_page("dashboard")
+
 # Always use dark
 is_dark = True
 
@@ -51,30 +53,63 @@ st.markdown(f'''
             font-weight: bold;
             font-size: 2.5rem;
         }}
+        .metric-context {{
+            font-size: 0.9rem;
+            color: #AAAAAA;
+        }}
+        .metric-flag {{
+            font-size: 0.9rem;
+            color: #FFB347;
+            font-weight: bold;
+        }}
     </style>
 ''', unsafe_allow_html=True)
 
 
 FRED_API_KEY = st.secrets["FRED_API_KEY"]
-FRED_BASE = "https://api.stlouisfed.org/fred/series/observations"
-
-def fetch_fred_latest(series_id):
-    params = {"series_id": series_id, "api_key": FRED_API_KEY, "file_type": "json", "sort_order": "desc", "limit": 1}
-    resp = requests.get(FRED_BASE, params=params).json().get("observations", [])
-    if resp:
-        val, date = resp[0]["value"], resp[0]["date"]
-        return val, pd.to_datetime(date).strftime("%b %d, %Y")
+
+def fred_latest(series_id):
+    row = derived_metrics.loc[series_id]
+    if pd.notna(row["value"]):
+        return f"{row['value']:g}", row["date"].strftime("%b %d, %Y")
     return "N/A", "N/A"
 
-def make_gauge(val):
+def metric_context(series_id, changes=(("YoY", "yoy"), ("3m ann.", "ann_3m"))):
+    """Change context and threshold flags for a card, as HTML."""
+    row = derived_metrics.loc[series_id]
+    unit = "%" if series_id in catalog.LEVEL_SERIES else " pts"
+    context = " · ".join(
+        f"{name} {row[col]:+.1f}{unit}" for name, col in changes if pd.notna(row[col])
+    )
+    flags = []
+    if row["sahm_flag"]:
+        flags.append("Sahm trigger")
+    if row["z_flag"]:
+        flags.append(f"Unusual (z {row['zscore']:+.1f})")
+    html = f'<div class="metric-context">{context or "&nbsp;"}</div>'
+    if flags:
+        html += f'<div class="metric-flag">⚠ {" · ".join(flags)}</div>'
+    return html
+
+SPARKLINE_DAYS = 90
+
+
+# Rebuilt only when the stored history changes (once a day)
+@st.cache_resource(max_entries=8, show_spinner=False)
+def make_gauge(history):
     # Use the same dark card background
     bg = card_bg
+    val = int(history.iloc[-1])
+    change_7d = fear_greed.change(history, 7)
+    change_30d = fear_greed.change(history, 30)
 
     fig = go.Figure(go.Indicator(
-        mode="gauge+number",
+        mode="gauge+number+delta" if change_7d is not None else "gauge+number",
         value=val,
+        delta={"reference": val - (change_7d or 0), "suffix": " 7d", "font": {"size": 16}},
         number={"font": {"color": txt_color, "size": 48}},
         title={"text": "CNN Fear & Greed", "font": {"color": txt_color, "size": 24}},
+        domain={"x": [0, 1], "y": [0.3, 1]},
         gauge={
             "axis": {
                 "range": [0, 100],
@@ -98,11 +133,26 @@ def make_gauge(val):
         }
     ))
 
+    # Sparkline of the recent history under the gauge
+    recent = history[history.index > history.index[-1] - pd.Timedelta(days=SPARKLINE_DAYS)]
+    fig.add_trace(go.Scatter(
+        x=recent.index, y=recent.values, mode="lines",
+        line={"color": txt_color, "width": 1.5}, hoverinfo="x+y", showlegend=False
+    ))
+    change_30d_text = f"{change_30d:+d}" if change_30d is not None else "n/a"
+    fig.add_annotation(
+        text=f"30d change: {change_30d_text} · last {SPARKLINE_DAYS} days",
+        x=0.5, y=0.27, xref="paper", yref="paper", showarrow=False,
+        font={"color": txt_color, "size": 12}
+    )
+
     fig.update_layout(
         paper_bgcolor=bg,
         plot_bgcolor=bg,
         font={"color": txt_color},
         title_font_color=txt_color,
+        xaxis={"domain": [0.05, 0.95], "visible": False},
+        yaxis={"domain": [0, 0.2], "range": [0, 100], "visible": False},
         margin=dict(l=0, r=0, t=40, b=0),
         height=400
     )
@@ -116,67 +166,51 @@ with col1:
 with col2:
     st.markdown(f'<a href="/calendar" target="_self">{datetime.now():%B %d, %Y}</a>', unsafe_allow_html=True)
 
-metrics = {
-    "U.S. Unemployment": ("UNRATE", "bearish"),
-    "Richmond Unemployment": ("RICH051URN", "bearish"),
-    "Charlotte Unemployment": ("CHAR737URN", "bearish"),
-    "Fed Funds Rate": ("FEDFUNDS", "bullish"),
-    "Michigan Consumer Sentiment": ("UMCSENT","bullish")
-}
-def fetch_inflation_yoy():
-    params = {
-        "series_id": "CPIAUCSL",
-        "api_key": FRED_API_KEY,
-        "file_type": "json",
-        "sort_order": "desc",
-        "limit": 13
-    }
-    resp = requests.get(FRED_BASE, params=params).json().get("observations", [])
-    if len(resp) >= 13:
-        latest = float(resp[0]["value"])
-        year_ago = float(resp[12]["value"])
-        yoy_change = ((latest - year_ago) / year_ago) * 100
-        date = pd.to_datetime(resp[0]["date"]).strftime("%b %d, %Y")
-        return f"{yoy_change:.1f}%", date
+metric_cards = catalog.DASHBOARD_METRICS
+def inflation_yoy():
+    row = derived_metrics.loc[catalog.CPI_SERIES]
+    if pd.notna(row["yoy"]):
+        return f"{row['yoy']:.1f}%", row["date"].strftime("%b %d, %Y")
     return "N/A", "N/A"
 
 def fetch_fear_and_greed():
     """
-    Return the latest Fear & Greed index (0–100) as an int,
+    Return the stored Fear & Greed history (daily Series, oldest first),
     or None on failure.
     """
-    url = "https://api.alternative.me/fng/?limit=1&format=json"
     try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json().get("data", [])
-        if data and "value" in data[0]:
-            # API returns the value as a string, e.g. "55"
-            return int(data[0]["value"])
+        history = fear_greed.cached_history()
+        return history if not history.empty else None
     except Exception as e:
         # Optional: log or display the error somewhere
         st.error(f"Error loading Fear & Greed: {e}")
     return None
 
 
-cols = st.columns(len(metrics) + 1)
+cols = st.columns(len(metric_cards) + 1)
+# Pull only new observations (if any are due) into the local store
+series_store.ensure(catalog.dashboard_series_ids(), FRED_API_KEY)
+# Values, changes and flags are materialized after each sync (utils/derived.py)
+derived_metrics = derived.latest(catalog.dashboard_series_ids())
 
-for idx, (label, (sid, sentiment)) in enumerate(metrics.items()):
-    val, date = fetch_fred_latest(sid)
+for idx, (label, (sid, sentiment)) in enumerate(metric_cards.items()):
+    val, date = fred_latest(sid)
     html = f'''
     <div class="metric-box">
         <h5>{label}</h5>
         <div class="{sentiment}">{val}</div>
+        {metric_context(sid)}
         <small>as of {date}</small>
     </div>'''
     cols[idx].markdown(html, unsafe_allow_html=True)
 
 # Append the CPI YoY chart
-cpi_val, cpi_date = fetch_inflation_yoy()
+cpi_val, cpi_date = inflation_yoy()
 cols[-1].markdown(f"""
     <div class="metric-box">
         <h5>Inflation (YoY CPI)</h5>
         <div class="bearish">{cpi_val}</div>
+        {metric_context(catalog.CPI_SERIES, (("MoM", "mom"), ("3m ann.", "ann_3m")))}
         <small>as of {cpi_date}</small>
     </div>
 """, unsafe_allow_html=True)
@@ -207,12 +241,13 @@ with chart_col:
     embed_tradingview_chart("SPY")
 
 with gauge_col:
-    fng_value = fetch_fear_and_greed()
-    if fng_value is not None:
-        st.plotly_chart(make_gauge(fng_value), use_container_width=True)
+    fng_history = fetch_fear_and_greed()
+    if fng_history is not None:
+        st.plotly_chart(make_gauge(fng_history), use_container_width=True)
     else:
         st.error("⚠️ Could not load Fear & Greed index")
 
 footer = "<div style='text-align:center;color:gray;'>Data: FRED & Yahoo Finance • Richmond Concierge Health</div>"
 st.markdown(footer, unsafe_allow_html=True)
 
+render_timer.finish()
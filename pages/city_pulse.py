@@ -1,8 +1,13 @@
+import time
 import streamlit as st
 import pandas as pd
-import requests
+from concurrent.futures import TimeoutError, as_completed
 from datetime import datetime
 
+from utils import catalog, derived, fema, metrics, metros, news, parallel, series_store
+
+render_timer = metrics.start_page("city_pulse")
+
 st.set_page_config(page_title="City Pulse", layout="wide")
 
 # Underline all headers via CSS
@@ -21,92 +26,89 @@ st.title("City Pulse: Economic Health by Location")
 
 st.markdown("This dashboard highlights unemployment rates and recent disaster events for key cities.")
 
-# --- FRED Unemployment series ---
-city_fred_series = {
-    "Richmond, VA":      "VARICH0URN",
-    "Owings Mills, MD":  "MDBALT5URN",
-    "Sandy Springs, GA": "ATLA013URN",
-    "Greenville, SC":    "SCGREE5URN",
-    "Charlotte, NC":     "CHAR737URN"
-}
+# --- Metros (data/metros.csv) ---
+metro_registry = metros.registry()
 
 # --- City selection ---
 selected_cities = st.multiselect(
     "Select Cities to View Current Unemployment",
-    options=list(city_fred_series.keys()),
-    default=list(city_fred_series.keys()),
+    options=metro_registry.names,
+    default=metro_registry.featured,
     key="current_city_select"
 )
 
-# --- News Screener for Selected Cities ---
-st.subheader("City News Screener")
+FRED_API_KEY = st.secrets.get("FRED_API_KEY", "")
+NEWS_API_KEY = st.secrets.get("NEWS_API_KEY", "")
 
-@st.cache_data
-def fetch_city_news(city):
-    try:
-        api_key = st.secrets["NEWS_API_KEY"]
-        url = f"https://newsapi.org/v2/everything?q={city}&language=en&sortBy=publishedAt&pageSize=5&apiKey={api_key}"
-        response = requests.get(url)
-        articles = response.json().get("articles", [])
-        return articles
-    except Exception as e:
-        st.error(f"Error fetching news for {city}: {e}")
-        return []
+REQUEST_TIMEOUT = 10  # seconds, per upstream call
+PAGE_TIMEOUT = REQUEST_TIMEOUT + 5  # seconds the page waits for all of them together
 
-for city in selected_cities:
-    st.markdown(f"#### ️{city}")
-    articles = fetch_city_news(city)
-    if articles:
-        for article in articles:
-            st.markdown(f"- [{article['title']}]({article['url']})")
-    else:
-        st.write("No recent headlines — check back later or view FEMA alerts below.")
+# --- Start all independent I/O at once ---
+# The fetchers run on the shared I/O pool, so they don't touch Streamlit;
+# errors propagate to the future and are reported when rendered.
+news_futures = {parallel.submit(news.cached_city_news, city, NEWS_API_KEY): city for city in selected_cities}
+fema_future = parallel.submit(fema.load_index, catalog.fema_states())
+unemployment_future = parallel.submit(series_store.ensure, metro_registry.series_ids(selected_cities), FRED_API_KEY)
 
+# One deadline for every wait below, so stalled upstreams cost the page
+# PAGE_TIMEOUT in total rather than PAGE_TIMEOUT each
+deadline = time.monotonic() + PAGE_TIMEOUT
 
 
-# --- FRED Unemployment series ---
-city_fred_series = {
-    "Richmond, VA":      "VARICH0URN",
-    "Owings Mills, MD":  "MDBALT5URN",
-    "Sandy Springs, GA": "ATLA013URN",
-    "Greenville, SC":    "SCGREE5URN",
-    "Charlotte, NC":     "CHAR737URN"
-}
+def time_left():
+    return max(0, deadline - time.monotonic())
 
-FRED_API_KEY = st.secrets.get("FRED_API_KEY", "")
 
-@st.cache_data
-def fetch_unemployment(series_id, start_date="2024-01-01"):
-    url = "https://api.stlouisfed.org/fred/series/observations"
-    params = {
-        "series_id": series_id,
-        "api_key": FRED_API_KEY,
-        "file_type": "json",
-        "observation_start": start_date
-    }
-    try:
-        response = requests.get(url, params=params, timeout=10).json()
-        df = pd.DataFrame(response.get("observations", []))
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df["value"] = pd.to_numeric(df["value"], errors="coerce")
-        return df[["date", "value"]].dropna()
-    except:
-        return pd.DataFrame(columns=["date", "value"])
+# --- News Screener for Selected Cities ---
+st.subheader("City News Screener")
+
+# One slot per city, filled in whichever order the responses arrive
+news_slots = {}
+for city in selected_cities:
+    st.markdown(f"#### ️{city}")
+    news_slots[city] = st.empty()
+    news_slots[city].caption("Loading headlines…")
+
+try:
+    for future in as_completed(news_futures, timeout=time_left()):
+        city = news_futures[future]
+        with news_slots[city].container():
+            try:
+                articles = future.result()
+            except Exception as e:
+                st.error(f"Error fetching news for {city}: {e}")
+                articles = []
+            if articles:
+                for article in articles:
+                    st.markdown(f"- [{article['title']}]({article['url']})")
+            else:
+                st.write("No recent headlines — check back later or view FEMA alerts below.")
+except TimeoutError:
+    for future, city in news_futures.items():
+        if not future.done():
+            news_slots[city].write("Headlines timed out — check back later or view FEMA alerts below.")
 
 # --- Latest Unemployment ---
 st.subheader("Latest Unemployment Rates")
-unemp_rows = []
-for city in selected_cities:
-    df = fetch_unemployment(city_fred_series[city])
-    if not df.empty:
-        latest = df.iloc[-1]
-        unemp_rows.append({
-            "City": city,
-            "Date": latest["date"].strftime("%Y-%m-%d"),
-            "Unemployment Rate (%)": latest["value"]
-        })
-if unemp_rows:
-    df_latest = pd.DataFrame(unemp_rows).set_index("City")
+try:
+    unemployment_future.result(timeout=time_left())
+except Exception:
+    pass  # render whatever the store already holds
+
+# Changes and flags are materialized after each sync (utils/derived.py)
+latest = derived.latest(metro_registry.series_ids(selected_cities))
+latest.index = pd.Index(selected_cities, name="City")
+latest = latest.dropna(subset=["value"])
+if not latest.empty:
+    df_latest = pd.DataFrame({
+        "Date": latest["date"].dt.strftime("%Y-%m-%d"),
+        "Unemployment Rate (%)": latest["value"],
+        "YoY Change (pts)": latest["yoy"].round(1),
+        "12-mo Avg (%)": latest["mean_12"].round(2),
+        # Metro rates aren't seasonally adjusted: the z-score is of the YoY change
+        "YoY Z-Score (5y)": latest["zscore"].round(2),
+        "Unusual YoY": latest["z_flag"]
+    })
     st.dataframe(df_latest)
 else:
     st.write("No unemployment data available.")
@@ -114,62 +116,52 @@ else:
 st.divider()
 
 # --- Historical Trends ---
-st.subheader("Historical Unemployment Trends")
-chart_cities = st.multiselect(
-    "Select Cities for Historical Line Chart",
-    options=list(city_fred_series.keys()),
-    default=["Richmond, VA", "Charlotte, NC"],
-    key="line_chart_select"
-)
-if chart_cities:
-    chart_df = pd.DataFrame()
-    for city in chart_cities:
-        df = fetch_unemployment(city_fred_series[city])
-        if not df.empty:
-            df = df.rename(columns={"value": city})
-            if chart_df.empty:
-                chart_df = df[["date", city]]
-            else:
-                chart_df = pd.merge(chart_df, df[["date", city]], on="date", how="outer")
-    if not chart_df.empty:
-        chart_df = chart_df.sort_values("date").set_index("date")
-        st.line_chart(chart_df, use_container_width=True)
-    else:
-        st.write("No historical data available.")
+# Its multiselect only affects the chart, so picking cities reruns just
+# this section instead of the news screener and FEMA lists too
+# st.multiselect rejects defaults missing from its options, so only keep
+# the ones data/metros.csv still lists
+chart_default = [n for n in ("Richmond, VA", "Charlotte, NC") if n in metro_registry.names]
+chart_default = chart_default or metro_registry.featured[:2]
+
+
+@st.fragment
+def historical_trends():
+    st.subheader("Historical Unemployment Trends")
+    chart_cities = st.multiselect(
+        "Select Cities for Historical Line Chart",
+        options=metro_registry.names,
+        default=chart_default,
+        key="line_chart_select"
+    )
+    if chart_cities:
+        series_store.ensure(metro_registry.series_ids(chart_cities), FRED_API_KEY)
+        chart_df = metro_registry.history(chart_cities, start="2024-01-01").dropna(how="all")
+        if not chart_df.empty:
+            st.line_chart(chart_df, use_container_width=True)
+        else:
+            st.write("No historical data available.")
+
+
+historical_trends()
 
 st.divider()
 
 # --- FEMA Disasters ---
 st.subheader("FEMA Disaster Events (2024–Present)")
 
-@st.cache_data
-def get_fema_events():
-    url = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
-    params = {
-        "$filter": "declarationDate ge '2024-01-01' and state in ('VA','NC','MD','SC','GA') and incidentType ne null",
-        "$orderby": "declarationDate desc",
-        "$format": "json"
-    }
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        return data.get("DisasterDeclarationsSummaries") or data.get("value") or []
-    except:
-        return []
-
-disaster_events = get_fema_events()
+try:
+    fema_index = fema_future.result(timeout=time_left())
+except TimeoutError:
+    st.error("FEMA events timed out — check back later.")
+    fema_index = {"by_state": {}}
+except Exception as e:
+    st.error(f"Error loading FEMA events: {e}")
+    fema_index = {"by_state": {}}
+
 for city in selected_cities:
     st.markdown(f"#### {city}")
-    state = city.split(",")[1].strip()
-    state_events = [e for e in disaster_events if e.get("state") == state]
-    seen = set()
-    unique_events = []
-    for e in state_events:
-        key = (e.get("incidentType"), e.get("declarationDate"))
-        if key not in seen:
-            seen.add(key)
-            unique_events.append(e)
+    state = metro_registry.state(city)
+    unique_events = fema.events_for_state(fema_index, state)
     if unique_events:
         for e in unique_events:
             inc_type = e.get("incidentType", "Unknown")
@@ -180,3 +172,5 @@ for city in selected_cities:
             st.markdown(f"- **{inc_type}** ({begin} to {end}) in {area}, declared on {decl}")
     else:
         st.write("No recent FEMA disaster events since Jan 2024.")
+
+render_timer.finish()
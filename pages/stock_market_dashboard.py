@@ -1,16 +1,20 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from streamlit_autorefresh import st_autorefresh
+import calendar
 import datetime
-import plotly.graph_objects as go
+
+from utils import catalog, downsample, metrics, price_store, quotes
+
+render_timer = metrics.start_page("stock_market_dashboard")
 
 st.set_page_config(page_title="Stock Market Overview", layout="wide")
 st.title("Stock Market Overview")
 st.markdown("This page monitors the stock market and major economic indicators.")
 
-# Auto-refresh every 60 seconds
-st_autorefresh(interval=60000, key="data_refresh")
+# The cards update themselves (see below); a full rerun every few minutes
+# picks up today's bar on the charts
+st_autorefresh(interval=price_store.TAIL_TTL * 1000, key="data_refresh")
 
 # Add custom spacing style
 st.markdown("""
@@ -26,27 +30,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Define stock tickers
-magnificent_7 = {
-    "AAPL": "Apple",
-    "MSFT": "Microsoft",
-    "GOOGL": "Alphabet",
-    "AMZN": "Amazon",
-    "META": "Meta",
-    "TSLA": "Tesla",
-    "NVDA": "NVIDIA"
-}
-
-key_indices = {
-    "^GSPC": "S&P 500"
-}
-
-all_cards = {**key_indices, **magnificent_7}
+all_cards = catalog.CARD_TICKERS
+
+# One process-wide snapshot for all sessions, streamed from Yahoo's
+# websocket (polled every QUOTE_POLL_SECONDS while that's unavailable)
+QUOTE_POLL_SECONDS = 15
+CARD_REFRESH_SECONDS = 5
+quote_snapshot = quotes.get_snapshot(list(all_cards), interval=QUOTE_POLL_SECONDS, stream=True)
 
 # Define card rendering function BEFORE it's used
 def render_stock_card(ticker, label):
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.fast_info
+        info = quote_snapshot.get(ticker) or {}
 
         current_price = info.get("lastPrice")
         previous_close = info.get("previousClose")
@@ -94,115 +89,127 @@ st.subheader("The Great 8")
 card_keys = list(all_cards.keys())
 labels = list(all_cards.values())
 
-row1 = st.columns(4)
-for i in range(4):
-    with row1[i]:
-        render_stock_card(card_keys[i], labels[i])
 
-row2 = st.columns(4)
-for i in range(4, 8):
-    with row2[i - 4]:
-        render_stock_card(card_keys[i], labels[i])
+# Only the cards rerun on this timer; it reads the in-memory snapshot,
+# so the charts below are neither rebuilt nor refetched
+@st.fragment(run_every=CARD_REFRESH_SECONDS)
+def great_8_cards():
+    row1 = st.columns(4)
+    for i in range(4):
+        with row1[i]:
+            render_stock_card(card_keys[i], labels[i])
+
+    row2 = st.columns(4)
+    for i in range(4, 8):
+        with row2[i - 4]:
+            render_stock_card(card_keys[i], labels[i])
+
+
+great_8_cards()
 
  
 # --- COMBINED PLOTLY CHARTS (Year + Quarter Filters, 2 per row, Adj Close) ---
-import datetime
-import calendar
-import yfinance as yf
-import pandas as pd
-import plotly.express as px
+def make_price_chart(df_plot, label):
+    # plotly.express is slow to import; load it only once charts are drawn
+    import plotly.express as px
+
+    fig = px.line(
+        df_plot,
+        x="Date",
+        y="Price",
+        title=label,
+        labels={"Price": "Price (USD)", "Date": "Date"}
+    )
+    fig.update_layout(
+        xaxis=dict(tickformat="%b %d", showgrid=True, gridcolor="lightgray"),
+        yaxis=dict(title="Price"),
+        margin=dict(l=20, r=20, t=40, b=30),
+        height=350
+    )
+    return fig
+
+
+# Half of the wide layout; charts get at most one point per pixel so long
+# windows don't ship every daily bar to the browser
+CHART_WIDTH_PX = 700
+max_points = downsample.point_budget(CHART_WIDTH_PX)
+
+
+# Figures are shared across sessions and reruns until the bars in their own
+# window change, so an autorefresh doesn't rebuild 13 identical px.line
+# charts, and a tail refresh only rebuilds charts whose window has today
+@st.cache_resource(max_entries=256, show_spinner=False)
+def price_chart(ticker, label, start_date, end_date, window_version, max_points):
+    prices = price_store.window([ticker], start_date, end_date)
+    if ticker in prices.columns:
+        series = downsample.lttb(prices[ticker].dropna(), max_points)
+    else:
+        series = pd.Series(dtype=float)
+    series.index.name = "Date"
+
+    # build two‑col DataFrame
+    df_plot = series.reset_index()
+    df_plot.columns = ["Date", "Price"]
+    return make_price_chart(df_plot, label)
 
 st.markdown("---")
 st.subheader("Market & Economic Charts")
 
-# 1) Year selector (last 5 years + current)
-today = datetime.date.today()
-current_year = today.year
-years = list(range(current_year - 5, current_year + 1))
-selected_year = st.selectbox("Select Year", years, index=len(years)-1, key="year_filter")
-
-# 2) Quarter selector (with year shown)
-quarter_defs = {
-    "Q1 (Jan–Mar)": (1, 3),
-    "Q2 (Apr–Jun)": (4, 6),
-    "Q3 (Jul–Sep)": (7, 9),
-    "Q4 (Oct–Dec)": (10, 12),
-    "Full Year":    (1, 12)
-}
-# build labels like "2025 Q1 (Jan–Mar)"
-quarter_labels = list(quarter_defs.keys())
-quarter_display = [f"{selected_year} {q}" for q in quarter_labels]
-selected_q_disp = st.selectbox("Select Quarter", quarter_display, key="quarter_filter")
-# pull out the quarter portion ("Q2 (Apr–Jun)")
-_, quarter_label = selected_q_disp.split(" ", 1)
-
-# 3) Compute start/end dates (clamped to today)
-q_start, q_end = quarter_defs[quarter_label]
-start_date = datetime.date(selected_year, q_start, 1)
-last_day = calendar.monthrange(selected_year, q_end)[1]
-end_date   = datetime.date(selected_year, q_end, last_day)
-if end_date > today:
-    end_date = today
-# yfinance's end is exclusive, so add one day to include today's bar
-end_query = end_date + datetime.timedelta(days=1)
-
-st.markdown(f"**Showing data from {start_date} to {end_date}**")
-
-# 4) All tickers in one dict
-plot_tickers = {
-    # Magnificent 7
-    "AAPL":   "Apple",
-    "MSFT":   "Microsoft",
-    "GOOGL":  "Alphabet",
-    "AMZN":   "Amazon",
-    "META":   "Meta",
-    "TSLA":   "Tesla",
-    "NVDA":   "NVIDIA",
-    # Key index
-    "^GSPC":  "S&P 500",
-    # Economic proxies
-    "^VIX":   "VIX",
-    "^DJI":   "Dow Jones",
-    "TIP":    "Inflation",
-    "UNG":    "Unemployment",
-    "TLT":    "Federal Debt"
-}
-
-# 5) Draw two charts per row
-items = list(plot_tickers.items())
-for i in range(0, len(items), 2):
-    cols = st.columns(2)
-    for col, (ticker, label) in zip(cols, items[i : i + 2]):
-        # fetch & trim
-        raw = yf.download(ticker, start=start_date, end=end_query)
-        raw.index = pd.to_datetime(raw.index)
-        raw = raw[raw.index <= pd.Timestamp(today)]
-
-        # pick Adj Close if available, else fall back to Close
-        if "Adj Close" in raw.columns:
-            series = raw["Adj Close"]
-        else:
-            series = raw.get("Close", raw.iloc[:, 0])
-
-        # build two‑col DataFrame
-        df_plot = series.reset_index()
-        df_plot.columns = ["Date", "Price"]
-
-        # plot
-        fig = px.line(
-            df_plot,
-            x="Date",
-            y="Price",
-            title=label,
-            labels={"Price": "Price (USD)", "Date": "Date"}
-        )
-        fig.update_layout(
-            xaxis=dict(tickformat="%b %d", showgrid=True, gridcolor="lightgray"),
-            yaxis=dict(title="Price"),
-            margin=dict(l=20, r=20, t=40, b=30),
-            height=350
-        )
-
-        with col:
-            st.plotly_chart(fig, use_container_width=True)
-
+# The selectors only affect the charts, so changing them reruns just this
+# section (not the cards or the rest of the page)
+@st.fragment
+def market_charts():
+    # 1) Year selector (last 5 years + current)
+    today = datetime.date.today()
+    current_year = today.year
+    years = list(range(current_year - catalog.PRICE_HISTORY_YEARS + 1, current_year + 1))
+    selected_year = st.selectbox("Select Year", years, index=len(years)-1, key="year_filter")
+
+    # 2) Quarter selector (with year shown)
+    quarter_defs = {
+        "Q1 (Jan–Mar)": (1, 3),
+        "Q2 (Apr–Jun)": (4, 6),
+        "Q3 (Jul–Sep)": (7, 9),
+        "Q4 (Oct–Dec)": (10, 12),
+        "Full Year":    (1, 12)
+    }
+    # build labels like "2025 Q1 (Jan–Mar)"
+    quarter_labels = list(quarter_defs.keys())
+    quarter_display = [f"{selected_year} {q}" for q in quarter_labels]
+    selected_q_disp = st.selectbox("Select Quarter", quarter_display, key="quarter_filter")
+    # pull out the quarter portion ("Q2 (Apr–Jun)")
+    _, quarter_label = selected_q_disp.split(" ", 1)
+
+    # 3) Compute start/end dates (clamped to today)
+    q_start, q_end = quarter_defs[quarter_label]
+    start_date = datetime.date(selected_year, q_start, 1)
+    last_day = calendar.monthrange(selected_year, q_end)[1]
+    end_date   = datetime.date(selected_year, q_end, last_day)
+    if end_date > today:
+        end_date = today
+
+    st.markdown(f"**Showing data from {start_date} to {end_date}**")
+
+    # 4) All tickers in one dict
+    plot_tickers = catalog.PLOT_TICKERS
+
+    # 5) Keep daily bars for the whole selector range in the local store
+    #    (only missing days are downloaded), then slice the selected window.
+    #    yfinance's end is exclusive, so add one day to include today's bar
+    price_store.update(tuple(plot_tickers), *catalog.price_history_range(today))
+
+    # 6) Draw two charts per row
+    items = list(plot_tickers.items())
+    for i in range(0, len(items), 2):
+        cols = st.columns(2)
+        for col, (ticker, label) in zip(cols, items[i : i + 2]):
+            window_version = price_store.window_version(ticker, start_date, end_date)
+            fig = price_chart(ticker, label, start_date, end_date, window_version, max_points)
+
+            with col:
+                st.plotly_chart(fig, use_container_width=True)
+
+
+market_charts()
+
+render_timer.finish()
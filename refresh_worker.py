@@ -0,0 +1,148 @@
+"""
+Headless data-refresh worker.
+
+Pulls every upstream the dashboard uses (FRED, yfinance, investpy,
+NewsAPI, Fear & Greed, FEMA) on its own schedule and writes the results
+to the local store the pages read from. Run it under cron or as a
+long-lived process next to Streamlit:
+
+    python refresh_worker.py                  # every job, forever
+    python refresh_worker.py --once           # one pass of every job (cron)
+    python refresh_worker.py --only fred fema
+
+Start Streamlit with DASHBOARD_READ_ONLY=1 so pages never call upstream
+themselves and only read what this worker stored.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+import tomllib
+from datetime import date
+from pathlib import Path
+
+from utils import (
+    catalog, derived, disk_cache, econ_calendar, fear_greed, fema, metrics,
+    metros, news, price_store, quotes, series_store,
+)
+
+SECRETS_PATH = Path(__file__).resolve().parent / ".streamlit" / "secrets.toml"
+METRICS_PORT = 9465  # Streamlit's own endpoint defaults to 9464
+
+log = logging.getLogger("refresh_worker")
+
+
+def load_secrets():
+    """API keys from .streamlit/secrets.toml, overridable by environment variables."""
+    secrets = {}
+    if SECRETS_PATH.exists():
+        with open(SECRETS_PATH, "rb") as f:
+            secrets = tomllib.load(f)
+    for name in ("FRED_API_KEY", "NEWS_API_KEY"):
+        secrets[name] = os.environ.get(name, secrets.get(name, ""))
+    return secrets
+
+
+def refresh_fred(secrets):
+    # sync() only asks FRED for series where a new observation is plausible
+    series_store.sync(catalog.fred_series_ids(), secrets["FRED_API_KEY"])
+    derived.materialize()
+
+
+def refresh_prices(secrets):
+    price_store.update(tuple(catalog.PLOT_TICKERS), *catalog.price_history_range())
+
+
+def refresh_quotes(secrets):
+    quotes.QuoteSnapshot(catalog.CARD_TICKERS).refresh()
+
+
+def refresh_calendar(secrets):
+    today = date.today()
+    for year, month in [(today.year, today.month)] + econ_calendar.adjacent_months(today.year, today.month):
+        econ_calendar.refresh_month(year, month)
+
+
+def refresh_news(secrets):
+    # Headlines only for the metros City Pulse shows by default
+    for city in metros.registry().featured:
+        news.refresh_city_news(city, secrets["NEWS_API_KEY"])
+
+
+def refresh_fear_greed(secrets):
+    fear_greed.refresh()
+
+
+def refresh_fema(secrets):
+    fema.refresh_index(catalog.fema_states())
+
+
+# name -> (interval in seconds, job)
+JOBS = {
+    "fred":       (3600, refresh_fred),
+    "prices":     (price_store.TAIL_TTL, refresh_prices),
+    "quotes":     (quotes.DEFAULT_INTERVAL, refresh_quotes),
+    "calendar":   (econ_calendar.CURRENT_MONTH_TTL, refresh_calendar),
+    "news":       (news.NEWS_TTL, refresh_news),
+    "fear_greed": (fear_greed.FNG_TTL, refresh_fear_greed),
+    "fema":       (fema.REFRESH_TTL, refresh_fema),
+}
+
+
+def run_job(name, secrets):
+    _, job = JOBS[name]
+    started = time.perf_counter()
+    try:
+        job(secrets)
+        log.info("%s refreshed in %.2fs", name, time.perf_counter() - started)
+        return True
+    except Exception:
+        log.exception("%s refresh failed", name)
+        return False
+
+
+def run_forever(names, secrets, stop):
+    """One thread per job so a slow upstream never delays the others."""
+    def loop(name):
+        interval, _ = JOBS[name]
+        while not stop.is_set():
+            run_job(name, secrets)
+            stop.wait(interval)
+
+    threads = [threading.Thread(target=loop, args=(name,), name=f"refresh-{name}", daemon=True) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--once", action="store_true", help="run every selected job once and exit")
+    parser.add_argument("--only", nargs="+", choices=sorted(JOBS), default=sorted(JOBS), metavar="JOB",
+                        help=f"jobs to run (default: all of {', '.join(sorted(JOBS))})")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help=f"Prometheus scrape port, 0 to disable (default: {METRICS_PORT})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # The worker is the writer, whatever the pages are configured to do
+    disk_cache.READ_ONLY = False
+    secrets = load_secrets()
+
+    if args.once:
+        ok = [run_job(name, secrets) for name in args.only]
+        return 0 if all(ok) else 1
+
+    metrics.serve(args.metrics_port)
+    stop = threading.Event()
+    try:
+        run_forever(args.only, secrets, stop)
+    except KeyboardInterrupt:
+        stop.set()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
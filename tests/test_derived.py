@@ -0,0 +1,35 @@
+"""derived.latest in read-only mode picks up the worker's materialization once it lands."""
+import pytest
+
+from utils import derived, disk_cache, series_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(series_store, "STORE_PATH", tmp_path / "series.sqlite3")
+    monkeypatch.setattr(series_store, "_initialized", False)
+    monkeypatch.setattr(disk_cache, "backend", disk_cache.MemoryBackend())
+    monkeypatch.setattr(derived, "_memo", {"checked_at": 0.0, "writes": None, "version": None, "latest": None})
+
+
+def reader_latest(monkeypatch):
+    """latest() as a read-only page would see it on its next check."""
+    monkeypatch.setattr(disk_cache, "READ_ONLY", True)
+    derived._memo["checked_at"] = 0.0
+    value = derived.latest(["UNRATE"]).at["UNRATE", "value"]
+    monkeypatch.setattr(disk_cache, "READ_ONLY", False)
+    return value
+
+
+def test_reader_reloads_after_worker_materializes(store, monkeypatch):
+    # Worker: sync, then materialize
+    series_store._append("UNRATE", [{"date": "2025-01-01", "value": "5.2"}])
+    derived.materialize()
+    assert reader_latest(monkeypatch) == 5.2
+
+    # Reader checks between the worker's next sync and its materialize
+    series_store._append("UNRATE", [{"date": "2025-02-01", "value": "9.9"}])
+    assert reader_latest(monkeypatch) == 5.2
+
+    derived.materialize()
+    assert reader_latest(monkeypatch) == 9.9
@@ -0,0 +1,120 @@
+"""price_store: non-trading days, intraday bars finalized on the next fetch, and splits/dividends."""
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from utils import price_store
+
+SATURDAY = date(2025, 6, 14)
+TUESDAY, WEDNESDAY, THURSDAY = date(2025, 6, 10), date(2025, 6, 11), date(2025, 6, 12)
+
+
+class FixedDate(date):
+    current = SATURDAY
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+class Upstream:
+    """Stub for price_store._download: a close per day (default 100) and split/dividend days."""
+
+    def __init__(self):
+        self.calls = []
+        self.closes = {}
+        self.actions = {}
+
+    def download(self, tickers, start, end):
+        self.calls.append((tuple(tickers), start, end))
+        days = pd.bdate_range(start, end, inclusive="left")
+        frame = pd.DataFrame({t: [self.closes.get(d.date(), 100.0) for d in days] for t in tickers}, index=days)
+        actions = {t: day.isoformat() for t, day in self.actions.items() if t in tickers and start <= day < end}
+        return frame, actions
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "PRICES_PATH", tmp_path / "prices.parquet")
+    monkeypatch.setattr(price_store, "COVERAGE_PATH", tmp_path / "prices.coverage.json")
+    monkeypatch.setattr(price_store, "_loaded", {"mtime": None, "frame": pd.DataFrame()})
+    monkeypatch.setattr(price_store.disk_cache, "READ_ONLY", False)
+    monkeypatch.setattr(price_store, "date", FixedDate)
+    monkeypatch.setattr(FixedDate, "current", SATURDAY)
+    stub = Upstream()
+    monkeypatch.setattr(price_store, "_download", stub.download)
+    return stub
+
+
+def set_fetched_at(ticker, when):
+    coverage = price_store._read_coverage()
+    coverage[ticker]["fetched_at"] = when
+    price_store._write_coverage(coverage)
+
+
+def stored(ticker, day):
+    return price_store.load().at[pd.Timestamp(day), ticker]
+
+
+def test_missing_ranges_tail_after_ttl():
+    cov = {"from": "2025-01-01", "to": "2025-06-15", "fetched_at": time.time() - price_store.TAIL_TTL - 1}
+    end = date(2025, 6, 15)
+    assert price_store._missing_ranges(cov, date(2025, 1, 1), end, SATURDAY) == [(SATURDAY, end)]
+    cov["fetched_at"] = time.time()
+    assert price_store._missing_ranges(cov, date(2025, 1, 1), end, SATURDAY) == []
+
+
+def test_update_on_non_trading_day(upstream):
+    start, end = date(2025, 6, 9), date(2025, 6, 15)
+    price_store.update(["SPY"], start, end)
+    assert len(upstream.calls) == 1
+    version = price_store.version()
+    assert version is not None
+
+    # Tail refetch after TAIL_TTL: Saturday has no bar
+    set_fetched_at("SPY", price_store._read_coverage()["SPY"]["fetched_at"] - price_store.TAIL_TTL - 1)
+    price_store.update(["SPY"], start, end)
+    assert len(upstream.calls) == 2
+    assert upstream.calls[-1][1:] == (SATURDAY, end)
+    assert price_store.version() == version  # nothing merged, prices not rewritten
+
+    # The empty range was recorded, so the next update doesn't ask again
+    price_store.update(["SPY"], start, end)
+    assert len(upstream.calls) == 2
+
+
+def test_intraday_bar_is_finalized_next_day(upstream, monkeypatch):
+    start = date(2025, 6, 9)
+    monkeypatch.setattr(FixedDate, "current", TUESDAY)
+    price_store.update(["SPY"], start, WEDNESDAY)  # Tuesday's bar taken at 14:00
+    set_fetched_at("SPY", datetime(2025, 6, 10, 14).timestamp())
+
+    upstream.closes[TUESDAY] = 105.0  # Tuesday's close
+    monkeypatch.setattr(FixedDate, "current", WEDNESDAY)
+    price_store.update(["SPY"], start, THURSDAY)
+    assert upstream.calls[-1][1:] == (TUESDAY, THURSDAY)
+    assert stored("SPY", TUESDAY) == 105.0
+
+
+def test_split_restates_stored_history(upstream, monkeypatch):
+    start = date(2025, 6, 2)
+    monkeypatch.setattr(FixedDate, "current", TUESDAY)
+    upstream.closes = {d.date(): 200.0 for d in pd.bdate_range(start, WEDNESDAY)}
+    price_store.update(["SPY"], start, WEDNESDAY)
+    set_fetched_at("SPY", datetime(2025, 6, 10, 14).timestamp())
+
+    # 2:1 split on Wednesday: Yahoo now reports every earlier close halved
+    upstream.closes = {}
+    upstream.actions["SPY"] = WEDNESDAY
+    monkeypatch.setattr(FixedDate, "current", WEDNESDAY)
+    price_store.update(["SPY"], start, THURSDAY)
+    assert upstream.calls[-1][1:] == (start, THURSDAY)  # whole stored range again
+    assert stored("SPY", start) == 100.0
+
+    # Already adjusted for it: the next tail refresh doesn't restate again
+    calls = len(upstream.calls)
+    set_fetched_at("SPY", time.time() - price_store.TAIL_TTL - 1)
+    price_store.update(["SPY"], start, THURSDAY)
+    assert len(upstream.calls) == calls + 1
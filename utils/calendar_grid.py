@@ -0,0 +1,106 @@
+"""
+Vectorized month-grid renderer for the economic calendar.
+
+Kept free of Streamlit so it can be reused (quarter views, other
+countries) and exercised on its own.
+"""
+import calendar
+from html import escape
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+CALENDAR_CSS = """
+<style>
+.calendar {
+    font-family: Arial, sans-serif;
+    width: 100%;
+    border-collapse: collapse;
+    table-layout: fixed;
+}
+.calendar th {
+    background: #333;
+    color: white;
+    padding: 10px;
+}
+.calendar td {
+    height: 120px;
+    vertical-align: top;
+    border: 1px solid #888;
+    padding: 4px;
+    font-size: 14px;
+}
+.event {
+    margin: 2px 0;
+    padding: 2px 4px;
+    border-radius: 4px;
+    font-size: 12px;
+    color: #000;
+}
+</style>
+"""
+
+LEGEND = "<br><strong>Legend:</strong> High (coral), Medium (blue), U.S. Holiday (purple)"
+
+
+def classify_events(cal_df):
+    """
+    Return a copy of an investpy calendar frame with parsed_date, day,
+    color (holiday > high importance > everything else) and the rendered
+    event_html added. The event column becomes categorical so filters are
+    a cheap isin() mask.
+    """
+    if cal_df.empty:
+        return pd.DataFrame({
+            "event": pd.Categorical([]),
+            "parsed_date": pd.Series(dtype="datetime64[ns]"),
+            "day": pd.Series(dtype=int),
+            "color": pd.Series(dtype=object),
+            "event_html": pd.Series(dtype=object),
+        })
+    df = cal_df.copy()
+    df["parsed_date"] = pd.to_datetime(df["date"], dayfirst=True)
+    df["day"] = df["parsed_date"].dt.day
+    is_holiday = df["event"].str.lower().str.startswith("us holiday")
+    importance = df["importance"] if "importance" in df else pd.Series("", index=df.index)
+    df["color"] = np.select(
+        [is_holiday, importance.eq("high")],
+        ["mediumorchid", "lightcoral"],
+        default="lightblue"
+    )
+    df["event_html"] = (
+        "<div class='event' style='background:" + df["color"] + ";'>"
+        + df["event"].map(escape) + "</div>"
+    )
+    df["event"] = df["event"].astype("category")
+    return df
+
+
+def events_by_day(events_df):
+    """Map day of month -> concatenated event <div>s."""
+    if events_df.empty:
+        return {}
+    return events_df.groupby("day", sort=False)["event_html"].agg("".join).to_dict()
+
+
+def render_month(year, month, events_df, title=None):
+    """Render one month as an HTML table from a classify_events() frame."""
+    cells = events_by_day(events_df)
+    weeks = calendar.Calendar(firstweekday=6).monthdayscalendar(year, month)
+    rows = "".join(
+        "<tr>" + "".join(
+            f"<td><strong>{day}</strong><br>{cells.get(day, '')}</td>" if day else "<td></td>"
+            for day in week
+        ) + "</tr>"
+        for week in weeks
+    )
+    header = "".join(f"<th>{day}</th>" for day in WEEKDAYS)
+    heading = title or f"{calendar.month_name[month]} {year}"
+    return "".join([
+        CALENDAR_CSS,
+        f"<h3>{heading}</h3>",
+        f"<table class='calendar'><tr>{header}</tr>{rows}</table>",
+        LEGEND,
+    ])
@@ -0,0 +1,80 @@
+"""
+Series and tickers the dashboard tracks.
+
+Shared by the Streamlit pages and the headless refresh worker so both
+agree on what has to be in the local store.
+"""
+from datetime import date, timedelta
+
+from utils import metros
+
+# label -> (FRED series id, card sentiment)
+DASHBOARD_METRICS = {
+    "U.S. Unemployment": ("UNRATE", "bearish"),
+    "Richmond Unemployment": ("RICH051URN", "bearish"),
+    "Charlotte Unemployment": ("CHAR737URN", "bearish"),
+    "Fed Funds Rate": ("FEDFUNDS", "bullish"),
+    "Michigan Consumer Sentiment": ("UMCSENT", "bullish")
+}
+CPI_SERIES = "CPIAUCSL"
+
+# Derived metrics (utils/derived.py) report changes of these index levels
+# in percent; every other series is a rate and changes in points
+LEVEL_SERIES = {CPI_SERIES, "UMCSENT"}
+# The Sahm-style trigger needs a seasonally adjusted unemployment rate
+SAHM_SERIES = {"UNRATE"}
+
+# City Pulse metros (and their FRED unemployment series) live in
+# data/metros.csv; see utils/metros.py
+
+MAGNIFICENT_7 = {
+    "AAPL": "Apple",
+    "MSFT": "Microsoft",
+    "GOOGL": "Alphabet",
+    "AMZN": "Amazon",
+    "META": "Meta",
+    "TSLA": "Tesla",
+    "NVDA": "NVIDIA"
+}
+KEY_INDICES = {
+    "^GSPC": "S&P 500"
+}
+CARD_TICKERS = {**KEY_INDICES, **MAGNIFICENT_7}
+
+PLOT_TICKERS = {
+    # Magnificent 7
+    **MAGNIFICENT_7,
+    # Key index
+    **KEY_INDICES,
+    # Economic proxies
+    "^VIX":   "VIX",
+    "^DJI":   "Dow Jones",
+    "TIP":    "Inflation",
+    "UNG":    "Unemployment",
+    "TLT":    "Federal Debt"
+}
+PRICE_HISTORY_YEARS = 6  # the year selector: last 5 years + current
+
+
+def dashboard_series_ids():
+    return [sid for sid, _ in DASHBOARD_METRICS.values()] + [CPI_SERIES]
+
+
+def fred_series_ids():
+    """Every FRED series any page reads."""
+    return list(dict.fromkeys(dashboard_series_ids() + metros.registry().series_ids()))
+
+
+def unadjusted_series_ids():
+    """Series without seasonal adjustment (FRED's metro ...URN unemployment rates)."""
+    return [sid for sid in fred_series_ids() if sid.endswith("URN")]
+
+
+def fema_states():
+    return metros.registry().states()
+
+
+def price_history_range(today=None):
+    """[start, end) of daily bars the stock page can show (yfinance end is exclusive)."""
+    today = today or date.today()
+    return date(today.year - PRICE_HISTORY_YEARS + 1, 1, 1), today + timedelta(days=1)
@@ -0,0 +1,148 @@
+"""
+Derived metrics over the stored FRED series.
+
+One vectorized pass over the wide (date x series) panel of every stored
+series computes year-over-year, month-over-month and 3-month annualized
+change, a 12-observation rolling mean, a 5-year z-score and threshold
+flags. The newest row of each series is materialized in the cache together
+with the store version it was computed from, so pages only read it; it is
+recomputed when a sync changes the store.
+
+Changes of catalog.LEVEL_SERIES (index levels such as CPI) are percent
+changes; every other series is a rate, so its changes are in percentage
+points. Lags match observation dates exactly (monthly data).
+
+Series that are not seasonally adjusted (the metro rates) swing with the
+seasons, so for them month-over-month and 3-month changes are left out
+and the z-score measures the year-over-year change instead of the level.
+The Sahm-style trigger only applies to catalog.SAHM_SERIES.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import catalog, disk_cache, series_store
+
+CACHE_KEY = "derived:latest"
+ROLLING_WINDOW = 12  # observations
+ZSCORE_WINDOW = 60  # observations (5 years of monthly data)
+ZSCORE_FLAG = 2.0
+SAHM_THRESHOLD = 0.5  # points above the prior 12-month low of the 3-month average
+RECHECK_SECONDS = 60  # how often readers look for a newer store version
+METRICS = ["value", "yoy", "mom", "ann_3m", "mean_12", "zscore", "sahm", "sahm_flag", "z_flag"]
+
+_memo = {"checked_at": 0.0, "writes": None, "version": None, "latest": None}
+_memo_lock = threading.Lock()
+
+
+def _lagged(panel, offset):
+    """panel's values `offset` earlier, aligned to panel's dates (NaN without an exact match)."""
+    lagged = panel.copy()
+    lagged.index = lagged.index + offset
+    return lagged.reindex(panel.index)
+
+
+def compute(panel, level_series=(), sahm_series=(), unadjusted_series=()):
+    """
+    Derived metrics for a wide panel (date index x series_id).
+    Returns a dict of metric name -> frame shaped like panel.
+    """
+    levels = panel.columns.isin(list(level_series))
+    unadjusted = panel.columns.isin(list(unadjusted_series))
+    year_ago = _lagged(panel, pd.DateOffset(years=1))
+    month_ago = _lagged(panel, pd.DateOffset(months=1))
+    quarter_ago = _lagged(panel, pd.DateOffset(months=3))
+
+    # Percent changes for levels, point changes for rates, column by column
+    yoy = np.where(levels, (panel / year_ago - 1) * 100, panel - year_ago)
+    mom = np.where(levels, (panel / month_ago - 1) * 100, panel - month_ago)
+    ann_3m = np.where(levels, ((panel / quarter_ago) ** 4 - 1) * 100, (panel - quarter_ago) * 4)
+    mom[:, unadjusted] = np.nan
+    ann_3m[:, unadjusted] = np.nan
+    yoy = pd.DataFrame(yoy, index=panel.index, columns=panel.columns)
+
+    rolling = panel.rolling(ROLLING_WINDOW, min_periods=ROLLING_WINDOW)
+    # Unadjusted series: z-score of the YoY change, which the seasons cancel out of
+    basis = panel.copy()
+    basis.loc[:, unadjusted] = yoy.loc[:, unadjusted]
+    long_run = basis.rolling(ZSCORE_WINDOW, min_periods=ROLLING_WINDOW)
+    zscore = (basis - long_run.mean()) / long_run.std()
+
+    # Sahm-style trigger: 3-month average vs. its low over the prior 12 months
+    avg_3m = panel.rolling(3, min_periods=3).mean()
+    sahm = avg_3m - avg_3m.shift(1).rolling(12, min_periods=12).min()
+    sahm.loc[:, ~panel.columns.isin(list(sahm_series))] = np.nan
+
+    return {
+        "value": panel,
+        "yoy": yoy,
+        "mom": pd.DataFrame(mom, index=panel.index, columns=panel.columns),
+        "ann_3m": pd.DataFrame(ann_3m, index=panel.index, columns=panel.columns),
+        "mean_12": rolling.mean(),
+        "zscore": zscore,
+        "sahm": sahm,
+        "sahm_flag": sahm >= SAHM_THRESHOLD,
+        "z_flag": zscore.abs() >= ZSCORE_FLAG,
+    }
+
+
+def latest_rows(derived):
+    """DataFrame (series_id x date and metrics) at each series' newest observation."""
+    value = derived["value"]
+    last_dates = pd.DatetimeIndex(value.apply(pd.Series.last_valid_index))
+    rows = value.index.get_indexer(last_dates)  # -1 for series with no observations
+    cols = np.arange(len(value.columns))
+    out = pd.DataFrame({"date": last_dates}, index=value.columns.rename("series_id"))
+    for name in METRICS:
+        values = derived[name].to_numpy(dtype=float)[rows, cols] if len(cols) else []
+        out[name] = np.where(rows >= 0, values, np.nan)
+    out[["sahm_flag", "z_flag"]] = out[["sahm_flag", "z_flag"]].fillna(0).astype(bool)
+    return out
+
+
+def materialize():
+    """Recompute from every stored series and store the result; returns it."""
+    version = series_store.version()
+    series_ids = series_store.stored_series()
+    panel = series_store.panel(series_ids)
+    derived = compute(panel, catalog.LEVEL_SERIES, catalog.SAHM_SERIES, catalog.unadjusted_series_ids())
+    latest = latest_rows(derived)
+    disk_cache.put(CACHE_KEY, {"version": version, "latest": latest}, 365 * 86400)
+    return version, latest
+
+
+def latest(series_ids=None):
+    """
+    Materialized metrics (series_id x metric) for series_ids (default: all).
+    Series not stored yet get NaN metrics and False flags. Checks the store
+    right after this process synced, otherwise at most every
+    RECHECK_SECONDS (to pick up the worker's syncs), and recomputes only if
+    it changed.
+    """
+    with _memo_lock:
+        stale = time.time() - _memo["checked_at"] > RECHECK_SECONDS
+        if stale or _memo["writes"] != series_store.write_count():
+            _memo["writes"] = series_store.write_count()
+            version = series_store.version()
+            if version != _memo["version"]:
+                stored, _ = disk_cache.get(CACHE_KEY)
+                if stored is not None and stored["version"] == version:
+                    _memo["latest"] = stored["latest"]
+                    _memo["version"] = version
+                elif not disk_cache.READ_ONLY:
+                    _, _memo["latest"] = materialize()
+                    _memo["version"] = version
+                elif stored is not None:
+                    # The worker hasn't materialized this version yet: serve the
+                    # previous one and look again on the next check
+                    _memo["latest"] = stored["latest"]
+            _memo["checked_at"] = time.time()
+        frame = _memo["latest"] if _memo["latest"] is not None else pd.DataFrame(columns=["date", *METRICS])
+    if series_ids is None:
+        return frame
+    frame = frame.reindex(list(series_ids))
+    frame[["sahm_flag", "z_flag"]] = frame[["sahm_flag", "z_flag"]].eq(True)  # NaN for missing series
+    return frame
+
@@ -0,0 +1,275 @@
+"""
+Small key/value cache with pluggable storage.
+
+Entries carry their own expiry. Reads go through get_or_refresh, which
+serves stale entries immediately and refreshes them on a background
+thread (stale-while-revalidate). Before loading, a caller claims the key
+for REFRESH_LEASE seconds, so across every process sharing the store only
+one refreshes an expired entry or fills a missing one; the others keep
+serving the stale value or wait for the new one.
+
+Storage is a CacheBackend, chosen with DASHBOARD_CACHE_BACKEND:
+- "sqlite" (default): one SQLite file in WAL mode under CACHE_DIR. Safe
+  for concurrent processes, so every Streamlit replica on a host (and
+  refresh_worker.py) shares one warm cache, and it survives restarts.
+- "memory": a per-process dict, for single-process runs and tests.
+
+With DASHBOARD_READ_ONLY=1 (when refresh_worker.py keeps the store warm)
+readers never call upstream: get_or_refresh only serves what is stored.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+
+from utils import metrics
+
+CACHE_DIR = Path(os.environ.get("DASHBOARD_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache"))
+CACHE_PATH = CACHE_DIR / "cache.sqlite3"
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_BACKEND = os.environ.get("DASHBOARD_CACHE_BACKEND", "sqlite").lower()
+READ_ONLY = os.environ.get("DASHBOARD_READ_ONLY", "").lower() in ("1", "true", "yes")
+REFRESH_LEASE = 30  # seconds a claimed refresh has before others may try
+LEASE_POLL = 0.1  # seconds between checks while another process fills a key
+
+
+class NotInStore(LookupError):
+    """Raised in read-only mode when a key has never been written."""
+
+
+class CacheBackend(ABC):
+    """Where entries live. Implementations must be thread-safe."""
+
+    @abstractmethod
+    def get(self, key):
+        """Return (value, expires_at) for key, or (None, None) if absent."""
+
+    @abstractmethod
+    def expiry(self, key):
+        """Return the expires_at timestamp for key, or None if absent."""
+
+    @abstractmethod
+    def put(self, key, value, expires_at):
+        """Store value (clearing any claim on key)."""
+
+    @abstractmethod
+    def claim(self, key, lease):
+        """
+        Atomically claim the right to load key for lease seconds. True for
+        one caller while key is expired or missing: an expired entry's
+        expiry is pushed forward by the lease (so others serve it as fresh
+        meanwhile), a missing key gets a lease of its own.
+        """
+
+    @abstractmethod
+    def release(self, key):
+        """Drop the lease on a missing key (e.g. its load failed)."""
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process dict. Values are shared with callers, not copied."""
+
+    def __init__(self):
+        self._entries = {}
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key, (None, None))
+
+    def expiry(self, key):
+        return self.get(key)[1]
+
+    def put(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._leases.pop(key, None)
+
+    def claim(self, key, lease):
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                value, expires_at = self._entries[key]
+                if expires_at >= now:
+                    return False
+                self._entries[key] = (value, now + lease)
+                return True
+            if self._leases.get(key, 0) >= now:
+                return False
+            self._leases[key] = now + lease
+            return True
+
+    def release(self, key):
+        with self._lock:
+            self._leases.pop(key, None)
+
+
+class SQLiteBackend(CacheBackend):
+    """Pickled values in one SQLite file (WAL), shared by every process on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS cache ("
+                        " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                        " stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, until REAL NOT NULL)"
+                    )
+                    conn.commit()
+                    self._initialized = True
+        return conn
+
+    def get(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        return pickle.loads(row[0]), row[1]
+
+    def expiry(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, value, expires_at):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value), time.time(), expires_at)
+            )
+            conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+
+    def claim(self, key, lease):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            # Only one writer at a time, so check-and-set is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            pushed = conn.execute(
+                "UPDATE cache SET expires_at = ? WHERE key = ? AND expires_at < ?",
+                (now + lease, key, now)
+            )
+            if pushed.rowcount:
+                return True
+            if conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone():
+                return False  # fresh, or another caller's refresh holds it
+            leased = conn.execute(
+                "INSERT INTO leases (key, until) VALUES (?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET until = excluded.until WHERE leases.until < ?",
+                (key, now + lease, now)
+            )
+            return leased.rowcount == 1
+
+    def release(self, key):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+
+
+BACKENDS = {
+    "sqlite": lambda: SQLiteBackend(CACHE_PATH),
+    "memory": MemoryBackend,
+}
+backend = BACKENDS[CACHE_BACKEND]()
+
+
+def set_backend(new_backend):
+    """Swap the storage every cache user goes through (e.g. MemoryBackend())."""
+    global backend
+    backend = new_backend
+
+
+def get(key):
+    """Return (value, expires_at) for key, or (None, None) if absent."""
+    return backend.get(key)
+
+
+def expiry(key):
+    """Return the expires_at timestamp for key, or None if absent."""
+    return backend.expiry(key)
+
+
+def put(key, value, ttl):
+    backend.put(key, value, time.time() + ttl)
+
+
+def refresh(key, loader, ttl):
+    """Call loader() now and store the result, regardless of expiry."""
+    return _store(key, loader, ttl)
+
+
+def _store(key, loader, ttl):
+    value = loader()
+    seconds = ttl(value) if callable(ttl) else ttl
+    if seconds > 0:
+        put(key, value, seconds)
+    return value
+
+
+def _refresh_in_background(key, loader, ttl):
+    if not backend.claim(key, REFRESH_LEASE):
+        return  # another thread or process is already refreshing it
+
+    def run():
+        try:
+            _store(key, loader, ttl)
+        except Exception:
+            pass  # keep serving the stale entry; retried once the lease runs out
+
+    threading.Thread(target=run, name=f"cache-refresh:{key}", daemon=True).start()
+
+
+def _fill(key, loader, ttl):
+    """Load a missing key, or wait for the caller that claimed it to store it."""
+    deadline = time.time() + REFRESH_LEASE
+    while not backend.claim(key, REFRESH_LEASE):
+        value, expires_at = get(key)
+        if expires_at is not None:
+            return value
+        if time.time() > deadline:
+            break  # the other loader stalled; load it here too
+        time.sleep(LEASE_POLL)
+    try:
+        return _store(key, loader, ttl)
+    finally:
+        backend.release(key)  # put() already did, unless the load failed or wasn't cached
+
+
+def get_or_refresh(key, loader, ttl):
+    """
+    Return the cached value for key, calling loader() to fill it.
+
+    ttl is either seconds or a callable taking the loaded value and
+    returning seconds; a ttl <= 0 means "don't cache" (e.g. failed fetches).
+    Expired entries are returned as-is while a background refresh runs.
+    In read-only mode loader is never called.
+    """
+    value, expires_at = get(key)
+    cache = key.split(":", 1)[0]
+    if expires_at is None:
+        metrics.cache_lookup(cache, "miss")
+    else:
+        metrics.cache_lookup(cache, "stale" if expires_at < time.time() else "hit")
+    if READ_ONLY:
+        if expires_at is None:
+            raise NotInStore(f"{key} is not in the local store yet; is refresh_worker.py running?")
+        return value
+    if expires_at is None:
+        return _fill(key, loader, ttl)
+    if expires_at < time.time():
+        _refresh_in_background(key, loader, ttl)
+    return value
@@ -0,0 +1,59 @@
+"""
+Shape-preserving downsampling for line charts.
+
+A chart can't show more than a point or two per horizontal pixel, so
+series longer than the budget are reduced with Largest-Triangle-Three-
+Buckets (LTTB), which keeps peaks, troughs and the overall shape of the
+line while capping how much data goes to the browser.
+"""
+import numpy as np
+import pandas as pd
+
+POINTS_PER_PIXEL = 1.0
+
+
+def point_budget(width_px, points_per_pixel=POINTS_PER_PIXEL):
+    """Maximum points worth plotting on a chart width_px wide."""
+    return max(3, int(width_px * points_per_pixel))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the n_out points LTTB keeps from (x, y).
+    Always keeps the first and last point; returns every position if the
+    series already fits.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Triangle area between the last kept point, each candidate and
+        # the next bucket's average (constant factor dropped)
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def lttb(series, max_points):
+    """Downsample a Series with a numeric or datetime index to at most max_points."""
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    return series.iloc[lttb_indices(x, series.to_numpy(), max_points)]
@@ -0,0 +1,113 @@
+"""
+Cached investpy economic calendar, one entry per month.
+
+Months are stored in the on-disk cache keyed by (year, month, importances):
+past months are effectively permanent, the current and future months are
+refreshed on a short TTL. Adjacent months can be prefetched in the
+background so paging through the picker doesn't wait on scraping.
+"""
+import calendar
+import threading
+import time
+from datetime import date
+
+import requests
+
+from utils import disk_cache, metrics, outbound
+
+COUNTRIES = ["United States"]
+DEFAULT_IMPORTANCES = ("high", "medium")
+PAST_MONTH_TTL = 365 * 86400
+CURRENT_MONTH_TTL = 3600
+FUTURE_MONTH_TTL = 6 * 3600
+
+_prefetching = set()
+_prefetching_lock = threading.Lock()
+
+
+def _month_ttl(year, month):
+    today = date.today()
+    if (year, month) < (today.year, today.month):
+        return PAST_MONTH_TTL
+    if (year, month) == (today.year, today.month):
+        return CURRENT_MONTH_TTL
+    return FUTURE_MONTH_TTL
+
+
+def _cache_key(year, month, importances):
+    return f"investpy:{year}-{month:02d}:{','.join(sorted(importances))}"
+
+
+def _scrape_month(year, month, importances):
+    import investpy  # slow to import; cached months never need it
+
+    end_day = calendar.monthrange(year, month)[1]
+    with metrics.track("investpy", "economic_calendar") as call:
+        events = outbound.call(
+            "www.investing.com", ("economic_calendar", year, month, importances),
+            lambda: investpy.economic_calendar(
+                from_date=f"01/{month:02d}/{year}",
+                to_date=f"{end_day}/{month:02d}/{year}",
+                countries=COUNTRIES,
+                importances=list(importances)
+            ),
+            retry_on=(requests.ConnectionError, requests.Timeout)
+        )
+        call.frame(events)
+    return events
+
+
+def fetch_month(year, month, importances=DEFAULT_IMPORTANCES):
+    """
+    Return the economic calendar DataFrame for one month.
+    Raises whatever investpy raises if the month isn't cached and scraping fails.
+    """
+    importances = tuple(importances)
+    return disk_cache.get_or_refresh(
+        _cache_key(year, month, importances),
+        lambda: _scrape_month(year, month, importances),
+        _month_ttl(year, month)
+    )
+
+
+def refresh_month(year, month, importances=DEFAULT_IMPORTANCES):
+    """Re-scrape one month into the cache regardless of its expiry."""
+    importances = tuple(importances)
+    return disk_cache.refresh(
+        _cache_key(year, month, importances),
+        lambda: _scrape_month(year, month, importances),
+        _month_ttl(year, month)
+    )
+
+
+def adjacent_months(year, month):
+    prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return [prev_month, next_month]
+
+
+def prefetch(months, importances=DEFAULT_IMPORTANCES):
+    """Warm the cache for (year, month) pairs on background threads."""
+    if disk_cache.READ_ONLY:
+        return
+    now = time.time()
+    for year, month in months:
+        key = _cache_key(year, month, importances)
+        expires_at = disk_cache.expiry(key)
+        if expires_at is not None and expires_at > now:
+            continue
+        with _prefetching_lock:
+            if key in _prefetching:
+                continue
+            _prefetching.add(key)
+
+        def run(year=year, month=month, key=key):
+            try:
+                fetch_month(year, month, importances)
+            except Exception:
+                pass  # the page will retry (and report) when the month is opened
+            finally:
+                with _prefetching_lock:
+                    _prefetching.discard(key)
+
+        threading.Thread(target=run, name=f"calendar-prefetch:{key}", daemon=True).start()
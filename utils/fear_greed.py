@@ -0,0 +1,75 @@
+"""
+Fear & Greed index history from alternative.me, kept in the cache.
+
+The full daily history is loaded once (limit=0); after that each refresh
+only asks for the days since the newest stored value and appends them.
+The latest value, recent changes and the sparkline are all read from the
+stored history, so a rerun makes no network calls.
+"""
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from utils import disk_cache, metrics, outbound
+
+FNG_URL = "https://api.alternative.me/fng/"
+REQUEST_TIMEOUT = 5  # seconds
+FNG_TTL = 3600  # recheck hourly until today's value is published
+PUBLISH_MARGIN = 600  # the index is published just after 00:00 UTC
+HISTORY_KEY = "fng:history"
+
+
+def fetch_history(limit=0):
+    """Daily index values (0–100) as a Series indexed by UTC date, oldest first. limit=0 is all of it."""
+    with metrics.track("fear_greed", "history") as call:
+        resp = outbound.get(FNG_URL, params={"limit": limit, "format": "json"}, timeout=REQUEST_TIMEOUT)
+        call.payload(len(resp.content))
+        data = resp.json().get("data", [])
+    # API returns values and timestamps as strings, e.g. "55"
+    values = {
+        pd.Timestamp(int(d["timestamp"]), unit="s").normalize(): int(d["value"])
+        for d in data if "value" in d and "timestamp" in d
+    }
+    return pd.Series(values, dtype="int64").sort_index()
+
+
+def _today():
+    return pd.Timestamp(datetime.now(timezone.utc).date())
+
+
+def _update_history():
+    """Stored history plus whatever days were published since (the full history the first time)."""
+    stored, _ = disk_cache.get(HISTORY_KEY)
+    if stored is None or stored.empty:
+        return fetch_history(0)
+    missing_days = (_today() - stored.index[-1]).days
+    if missing_days <= 0:
+        return stored
+    recent = fetch_history(missing_days + 1)
+    return recent.combine_first(stored).astype("int64")
+
+
+def _history_ttl(history):
+    if history.empty:
+        return 0  # don't cache failures
+    if history.index[-1] < _today():
+        return FNG_TTL
+    next_publish = (_today() + pd.Timedelta(days=1)).tz_localize("UTC").timestamp() + PUBLISH_MARGIN
+    return max(next_publish - time.time(), FNG_TTL)
+
+
+def cached_history():
+    return disk_cache.get_or_refresh(HISTORY_KEY, _update_history, _history_ttl)
+
+
+def refresh():
+    return disk_cache.refresh(HISTORY_KEY, _update_history, _history_ttl)
+
+
+def change(history, days):
+    """Change in the index over the last `days` days, or None if the history is too short."""
+    if history.empty:
+        return None
+    then = history.asof(history.index[-1] - pd.Timedelta(days=days))
+    return None if pd.isna(then) else int(history.iloc[-1] - then)
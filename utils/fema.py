@@ -0,0 +1,107 @@
+"""
+OpenFEMA disaster declaration ingest.
+
+Declarations are paged with $top/$skip and kept on disk, with a
+declarationDate watermark per state: how far that state has been checked.
+A query over several states checks all of them up to the newest record it
+returned, so they advance together (even states without declarations) and
+refreshes only ask for records on or after the newest one already seen.
+Records are deduplicated by id and indexed per state, collapsed to one
+entry per (incidentType, declarationDate) the way the page lists them.
+"""
+from collections import defaultdict
+
+from utils import disk_cache, metrics, outbound
+
+FEMA_URL = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
+START_DATE = "2024-01-01"
+PAGE_SIZE = 1000
+REQUEST_TIMEOUT = 10  # seconds, per page
+REFRESH_TTL = 6 * 3600
+INDEX_KEY = "fema:index"
+FIELDS = [
+    "id", "state", "incidentType", "declarationDate",
+    "incidentBeginDate", "incidentEndDate", "designatedArea",
+]
+
+
+def _fetch_since(states, since):
+    """Page through every declaration for states declared on/after since."""
+    state_list = ",".join(f"'{s}'" for s in sorted(states))
+    params = {
+        "$filter": f"declarationDate ge '{since}' and state in ({state_list}) and incidentType ne null",
+        "$select": ",".join(FIELDS),
+        "$orderby": "declarationDate,id",
+        "$top": PAGE_SIZE,
+        "$format": "json",
+    }
+    records, skip = [], 0
+    while True:
+        with metrics.track("fema", "declarations") as call:
+            resp = outbound.get(FEMA_URL, params={**params, "$skip": skip}, timeout=REQUEST_TIMEOUT)
+            call.payload(len(resp.content))
+            data = resp.json()
+        page = data.get("DisasterDeclarationsSummaries") or data.get("value") or []
+        records.extend(page)
+        if len(page) < PAGE_SIZE:
+            return records
+        skip += PAGE_SIZE
+
+
+def _build_by_state(records):
+    by_state = defaultdict(list)
+    seen = set()
+    for rec in sorted(records.values(), key=lambda r: r.get("declarationDate") or "", reverse=True):
+        key = (rec.get("state"), rec.get("incidentType"), rec.get("declarationDate"))
+        if key not in seen:
+            seen.add(key)
+            by_state[rec.get("state")].append(rec)
+    return dict(by_state)
+
+
+def _refresh(states):
+    """Fetch only declarations newer than each state's watermark and merge them in."""
+    index, _ = disk_cache.get(INDEX_KEY)
+    index = index or {"records": {}, "watermarks": {}}
+    records, watermarks = dict(index["records"]), dict(index["watermarks"])
+
+    # New states are backfilled from START_DATE; known states share one
+    # paged query from the oldest of their watermarks (normally all equal)
+    known = [s for s in states if s in watermarks]
+    new = [s for s in states if s not in watermarks]
+    groups = {}
+    if known:
+        groups[min(watermarks[s] for s in known)[:10]] = known
+    if new:
+        groups.setdefault(START_DATE, []).extend(new)
+    for since, group in groups.items():
+        checked = since
+        for rec in _fetch_since(group, since):
+            records[rec.get("id") or (rec.get("state"), rec.get("declarationDate"), rec.get("designatedArea"))] = rec
+            checked = max(checked, rec.get("declarationDate") or "")
+        for state in group:
+            watermarks[state] = max(watermarks.get(state, ""), checked)
+
+    return {"records": records, "watermarks": watermarks, "by_state": _build_by_state(records)}
+
+
+def load_index(states):
+    """
+    Return the per-state declaration index, refreshing it in the background
+    once it is older than REFRESH_TTL (synchronously if a state is new).
+    """
+    states = sorted(states)
+    index, _ = disk_cache.get(INDEX_KEY)
+    if index is not None and any(s not in index["watermarks"] for s in states) and not disk_cache.READ_ONLY:
+        return refresh_index(states)
+    return disk_cache.get_or_refresh(INDEX_KEY, lambda: _refresh(states), REFRESH_TTL)
+
+
+def refresh_index(states):
+    """Pull new declarations for states into the index now."""
+    return disk_cache.refresh(INDEX_KEY, lambda: _refresh(sorted(states)), REFRESH_TTL)
+
+
+def events_for_state(index, state):
+    """Unique declarations for one state, newest first."""
+    return index["by_state"].get(state, [])
@@ -0,0 +1,82 @@
+"""
+Shared FRED client.
+
+All FRED traffic goes through the shared outbound scheduler (pooled,
+rate-limited, retried), and batches of series are fetched concurrently
+so a page waits for the slowest single request instead of the sum of
+them. observation_ttl says when a new observation could plausibly have
+been released, which is when utils/series_store.py syncs a series again.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+
+from utils import metrics, outbound
+
+FRED_BASE = "https://api.stlouisfed.org/fred/series/observations"
+DEFAULT_TIMEOUT = 10  # seconds, per request
+MAX_WORKERS = 8
+
+# Sync policy: wait until the next observation could exist, then poll
+# every RECHECK_TTL until it shows up.
+DEFAULT_PERIOD = timedelta(days=31)  # most dashboard series are monthly
+RECHECK_TTL = 6 * 3600
+MIN_TTL = 3600
+MAX_TTL = 31 * 86400
+
+
+def fetch_observations(series_id, api_key, timeout=DEFAULT_TIMEOUT, **params):
+    """
+    Return the raw FRED observation list for one series,
+    or an empty list on failure.
+    """
+    query = {"series_id": series_id, "api_key": api_key, "file_type": "json", **params}
+    try:
+        with metrics.track("fred", "observations") as call:
+            resp = outbound.get(FRED_BASE, params=query, timeout=timeout)
+            call.payload(len(resp.content))
+            return resp.json().get("observations", [])
+    except (requests.RequestException, ValueError):
+        return []
+
+
+def observation_ttl(observations, now=None):
+    """
+    Seconds until a newer observation could be published.
+
+    The series frequency is inferred from the spacing of the observations
+    (monthly when there are too few to tell). A period's value can't be
+    released before that period ends, so the next observation after
+    last_date can't appear before last_date + 2 periods.
+    """
+    if not observations:
+        return 0  # don't cache failures
+    dates = sorted(date.fromisoformat(o["date"]) for o in observations)
+    gaps = sorted(b - a for a, b in zip(dates, dates[1:]))
+    period = gaps[len(gaps) // 2] if gaps else DEFAULT_PERIOD
+    earliest_release = datetime.combine(dates[-1] + 2 * period, datetime.min.time())
+    seconds = earliest_release.timestamp() - (now or time.time())
+    if seconds <= 0:
+        return RECHECK_TTL
+    return min(max(seconds, MIN_TTL), MAX_TTL)
+
+
+def fetch_many(params_by_series, api_key, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch several series concurrently.
+
+    params_by_series maps series_id -> extra query params for that series
+    (e.g. {"UNRATE": {"observation_start": "2025-01-01"}}).
+    Returns {series_id: observations}.
+    """
+    if not params_by_series:
+        return {}
+    workers = min(MAX_WORKERS, len(params_by_series))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            sid: pool.submit(fetch_observations, sid, api_key, timeout, **params)
+            for sid, params in params_by_series.items()
+        }
+        return {sid: fut.result() for sid, fut in futures.items()}
@@ -0,0 +1,112 @@
+"""
+Prometheus metrics for upstream calls, caches and page renders.
+
+Every outbound call goes through track(), which records latency, errors
+and payload size per (upstream, call). Cache lookups are counted by
+outcome, and each Streamlit script times its own render with
+start_page(). serve() exposes everything on a scrape endpoint, once per
+process (port from DASHBOARD_METRICS_PORT, 0 disables it).
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import REGISTRY, Counter, Histogram, start_http_server
+
+METRICS_PORT = int(os.environ.get("DASHBOARD_METRICS_PORT", "9464"))
+
+log = logging.getLogger(__name__)
+_serve_lock = threading.Lock()
+_serving = False
+
+
+def _metric(cls, name, documentation, labels, **kwargs):
+    # Streamlit re-imports changed modules; reuse what is already registered
+    existing = REGISTRY._names_to_collectors.get(name)
+    if existing is not None:
+        return existing
+    return cls(name, documentation, labels, **kwargs)
+
+
+UPSTREAM_LATENCY = _metric(
+    Histogram, "dashboard_upstream_latency_seconds", "Outbound call latency", ["upstream", "call"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+UPSTREAM_ERRORS = _metric(
+    Counter, "dashboard_upstream_errors_total", "Outbound calls that raised", ["upstream", "call"],
+)
+UPSTREAM_PAYLOAD = _metric(
+    Histogram, "dashboard_upstream_payload_bytes", "Outbound call response size", ["upstream", "call"],
+    buckets=(1e3, 1e4, 1e5, 1e6, 1e7),
+)
+CACHE_LOOKUPS = _metric(
+    Counter, "dashboard_cache_lookups_total", "Cache lookups by outcome (hit, stale, miss)", ["cache", "result"],
+)
+PAGE_RENDER = _metric(
+    Histogram, "dashboard_page_render_seconds", "Streamlit script run time", ["page"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class _Call:
+    def __init__(self, upstream, call):
+        self.labels = (upstream, call)
+
+    def payload(self, nbytes):
+        UPSTREAM_PAYLOAD.labels(*self.labels).observe(nbytes)
+
+    def frame(self, df):
+        """Record a DataFrame result's in-memory size as the payload."""
+        self.payload(int(df.memory_usage(deep=True).sum()))
+
+
+@contextmanager
+def track(upstream, call):
+    """
+    Time one outbound call; the block may report its size with
+    .payload(nbytes) or .frame(df). Exceptions are counted and re-raised.
+    """
+    tracked = _Call(upstream, call)
+    started = time.perf_counter()
+    try:
+        yield tracked
+    except Exception:
+        UPSTREAM_ERRORS.labels(upstream, call).inc()
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(upstream, call).observe(time.perf_counter() - started)
+
+
+def cache_lookup(cache, result):
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+class PageTimer:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+
+    def finish(self):
+        PAGE_RENDER.labels(self.page).observe(time.perf_counter() - self.started)
+
+
+def start_page(page):
+    """Call at the top of a script and .finish() at the bottom."""
+    serve()
+    return PageTimer(page)
+
+
+def serve(port=None):
+    """Start the scrape endpoint once for this process."""
+    global _serving
+    port = METRICS_PORT if port is None else port
+    with _serve_lock:
+        if _serving or not port:
+            return
+        _serving = True
+        try:
+            start_http_server(port)
+        except OSError as exc:
+            log.warning("metrics endpoint not started on port %s: %s", port, exc)
@@ -0,0 +1,58 @@
+"""
+Metro area registry.
+
+Every metro City Pulse can show is one row of data/metros.csv: display
+name, state, CBSA code, FRED unemployment series and whether it is shown
+by default. The registry is loaded once per process (and again only if
+the file changes) with indexes by state and by series id, and reads the
+history of any subset of metros in one store query.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils import series_store
+
+METROS_PATH = Path(__file__).resolve().parent.parent / "data" / "metros.csv"
+
+_loaded = {"mtime": None, "registry": None}
+
+
+class MetroRegistry:
+    def __init__(self, frame):
+        self.frame = frame.set_index("name")
+        self.names = list(self.frame.index)
+        self.featured = list(self.frame.index[self.frame["featured"].astype(bool)])
+        self.by_state = {state: list(group.index) for state, group in self.frame.groupby("state")}
+        self.by_series = dict(zip(self.frame["unemployment_series"], self.frame.index))
+
+    def state(self, name):
+        return self.frame.at[name, "state"]
+
+    def states(self, names=None):
+        """Sorted unique states of names (default: every metro)."""
+        if names is None:
+            return sorted(self.by_state)
+        return sorted(set(self.frame.loc[list(names), "state"]))
+
+    def series_ids(self, names=None):
+        """Unemployment series ids for names, in the same order (default: every metro)."""
+        names = self.names if names is None else list(names)
+        return list(self.frame.loc[names, "unemployment_series"])
+
+    def history(self, names, start=None):
+        """Stored history as one wide frame (date index x metro name)."""
+        wide = series_store.panel(self.series_ids(names), start)
+        wide.columns = list(names)
+        return wide
+
+
+def registry(path=METROS_PATH):
+    """Return the registry for path, re-reading it only when the file changed."""
+    mtime = os.path.getmtime(path)
+    if _loaded["mtime"] != (path, mtime):
+        frame = pd.read_csv(path, dtype={"cbsa": str})
+        _loaded["registry"] = MetroRegistry(frame)
+        _loaded["mtime"] = (path, mtime)
+    return _loaded["registry"]
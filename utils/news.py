@@ -0,0 +1,28 @@
+"""
+NewsAPI headlines per city, cached on disk.
+"""
+from utils import disk_cache, metrics, outbound
+
+NEWS_URL = "https://newsapi.org/v2/everything"
+REQUEST_TIMEOUT = 10  # seconds
+NEWS_TTL = 15 * 60
+
+
+def fetch_city_news(city, api_key):
+    params = {"q": city, "language": "en", "sortBy": "publishedAt", "pageSize": 5, "apiKey": api_key}
+    with metrics.track("newsapi", "everything") as call:
+        response = outbound.get(NEWS_URL, params=params, timeout=REQUEST_TIMEOUT)
+        call.payload(len(response.content))
+        return response.json().get("articles", [])
+
+
+def _key(city):
+    return f"news:{city}"
+
+
+def cached_city_news(city, api_key):
+    return disk_cache.get_or_refresh(_key(city), lambda: fetch_city_news(city, api_key), NEWS_TTL)
+
+
+def refresh_city_news(city, api_key):
+    return disk_cache.refresh(_key(city), lambda: fetch_city_news(city, api_key), NEWS_TTL)
@@ -0,0 +1,173 @@
+"""
+Shared outbound request scheduler.
+
+Every upstream call goes through here:
+- a token bucket per host keeps us under each API's rate limit,
+- tenacity retries throttling and transient failures with jittered
+  exponential backoff,
+- single-flight coalescing: concurrent identical requests (same URL and
+  params, or same call key) share one in-flight call instead of each
+  hitting the upstream after an autorefresh tick,
+- hosts in SERIALIZED_HOSTS run one library call at a time (yf.download
+  keeps its results in module globals, so overlapping calls corrupt
+  each other).
+"""
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+DEFAULT_TIMEOUT = 10  # seconds
+MAX_ATTEMPTS = 4
+BACKOFF_MULTIPLIER = 0.5  # seconds; waits are random in [0, multiplier * 2**attempt]
+BACKOFF_MAX = 20
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# host -> (requests per second, burst)
+HOST_LIMITS = {
+    "api.stlouisfed.org": (2, 20),     # FRED allows 120 requests/minute per key
+    "newsapi.org": (1, 5),
+    "api.alternative.me": (1, 5),      # 60 requests/minute
+    "www.fema.gov": (5, 10),
+    "query1.finance.yahoo.com": (1, 4),
+    "www.investing.com": (0.5, 3),
+}
+DEFAULT_LIMIT = (5, 10)
+YAHOO_HOST = "query1.finance.yahoo.com"
+SERIALIZED_HOSTS = {YAHOO_HOST}
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=len(HOST_LIMITS), pool_maxsize=16))
+
+
+class TokenBucket:
+    """Blocking token bucket: acquire() waits until a token is available."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_host_locks = {host: threading.Lock() for host in SERIALIZED_HOSTS}
+
+
+def _bucket(host):
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT))
+        return _buckets[host]
+
+
+def _single_flight(key, fn):
+    """Run fn once per key at a time; concurrent callers get the same result."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+    try:
+        future.set_result(fn())
+    except BaseException as exc:
+        future.set_exception(exc)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+    return future.result()
+
+
+def _retryable_http(exc):
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _with_retry(host, fn, retry_if):
+    retrying = Retrying(
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=BACKOFF_MULTIPLIER, max=BACKOFF_MAX),
+        retry=retry_if_exception(retry_if),
+        reraise=True,
+    )
+    for attempt in retrying:
+        with attempt:
+            _bucket(host).acquire()
+            with _host_locks.get(host, nullcontext()):
+                return fn()
+
+
+def get(url, params=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Rate-limited, retried, coalesced GET. Returns the Response (body
+    already read); raises requests.HTTPError for error statuses once
+    retries are exhausted.
+    """
+    params = params or {}
+    host = urlsplit(url).hostname
+
+    def send():
+        resp = _session.get(url, params=params, timeout=timeout)
+        resp.raise_for_status()
+        return resp
+
+    key = ("GET", url, tuple(sorted((k, str(v)) for k, v in params.items())))
+    return _single_flight(key, lambda: _with_retry(host, send, _retryable_http))
+
+
+def call(host, key, fn, retry_on=()):
+    """
+    Schedule a library call (yfinance, investpy) that talks to host.
+    key identifies identical calls for coalescing; retry_on lists the
+    exception types worth retrying.
+    """
+    return _single_flight((host, key), lambda: _with_retry(host, fn, lambda exc: isinstance(exc, retry_on)))
+
+
+def _throttled(errors):
+    return any("rate limit" in str(e).lower() or "too many requests" in str(e).lower() for e in errors)
+
+
+def yf_download(key, tickers, **kwargs):
+    """
+    Scheduled yf.download(tickers, **kwargs). yf.download swallows
+    per-ticker failures (rate limits included) and leaves them in
+    yfinance.shared._ERRORS, so they are checked here, while the host is
+    still held, and a throttled download is raised as YFRateLimitError and
+    retried.
+    """
+    import yfinance as yf  # slow to import; only needed when downloading
+    from yfinance import shared
+    from yfinance.exceptions import YFRateLimitError
+
+    def download():
+        raw = yf.download(list(tickers), progress=False, **kwargs)
+        if _throttled(getattr(shared, "_ERRORS", {}).values()):
+            raise YFRateLimitError()
+        return raw
+
+    return call(YAHOO_HOST, key, download, retry_on=(YFRateLimitError,))
@@ -0,0 +1,18 @@
+"""
+Process-wide bounded thread pool for page I/O.
+
+Pages submit their independent upstream calls here up front and render
+each result as it arrives, so page time is the slowest call rather than
+the sum. The pool is shared by all sessions, which also caps how many
+upstream requests the process has in flight.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 16
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="page-io")
+
+
+def submit(fn, *args, **kwargs):
+    """Schedule fn(*args, **kwargs) on the shared pool and return its Future."""
+    return _pool.submit(fn, *args, **kwargs)
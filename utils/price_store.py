@@ -0,0 +1,219 @@
+"""
+Local daily price store.
+
+Adjusted closes for every ticker live in one wide Parquet file
+(Date x ticker), with a JSON sidecar recording which date range has been
+fetched per ticker. update() only downloads the days a ticker is missing
+(plus today's still-moving bar every TAIL_TTL seconds, and the bars of
+the day it last fetched, which may have been intraday); window() is an
+in-memory slice.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+import pandas as pd
+
+from utils import disk_cache, metrics, outbound
+from utils.disk_cache import CACHE_DIR
+
+PRICES_PATH = CACHE_DIR / "prices.parquet"
+COVERAGE_PATH = CACHE_DIR / "prices.coverage.json"
+TAIL_TTL = 300  # seconds before today's bar is refetched
+
+_lock = threading.Lock()
+_loaded = {"mtime": None, "frame": pd.DataFrame()}
+
+
+def load():
+    """Return the stored wide price frame, re-reading only when the file changed."""
+    try:
+        mtime = os.path.getmtime(PRICES_PATH)
+    except OSError:
+        return pd.DataFrame()
+    if mtime != _loaded["mtime"]:
+        _loaded["frame"] = pd.read_parquet(PRICES_PATH)
+        _loaded["mtime"] = mtime
+    return _loaded["frame"]
+
+
+def _read_coverage():
+    try:
+        with open(COVERAGE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_prices(prices):
+    # Write-then-rename so readers never see a half-written file
+    tmp = PRICES_PATH.with_suffix(".tmp")
+    prices.to_parquet(tmp)
+    os.replace(tmp, PRICES_PATH)
+
+
+def _write_coverage(coverage):
+    tmp = COVERAGE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(coverage, f)
+    os.replace(tmp, COVERAGE_PATH)
+
+
+def _missing_ranges(cov, start, end, today):
+    """Date ranges [from, to) in [start, end) not yet fetched (or not yet final) for one ticker."""
+    if cov is None:
+        return [(start, end)]
+    have_from, have_to = date.fromisoformat(cov["from"]), date.fromisoformat(cov["to"])
+    # Bars from the day of the last fetch on may have been taken intraday, so
+    # they are fetched again along with anything newer
+    unsettled = min(have_to, today, date.fromtimestamp(cov["fetched_at"]))
+    ranges = []
+    if start < have_from:
+        ranges.append((start, have_from))
+    if end > have_to:
+        ranges.append((unsettled, end))
+    elif end > today and time.time() - cov["fetched_at"] > TAIL_TTL:
+        ranges.append((unsettled, end))  # today's bar is still moving
+    return ranges
+
+
+def _field(raw, name, tickers):
+    """One field of a yf.download frame as Date x ticker (None if absent)."""
+    if isinstance(raw.columns, pd.MultiIndex):
+        return raw[name] if name in raw.columns.get_level_values(0) else None
+    return raw[[name]].set_axis(list(tickers), axis=1) if name in raw.columns else None
+
+
+def _download(tickers, start, end):
+    """
+    Adj Close (falling back to Close) for tickers as a wide frame, and
+    {ticker: date of its latest split or dividend in the range}.
+    """
+    with metrics.track("yfinance", "history") as call:
+        raw = outbound.yf_download(
+            ("history", tuple(tickers), start, end), tickers,
+            start=start, end=end, group_by="column", actions=True
+        )
+        call.frame(raw)
+    if raw.empty:
+        return raw, {}
+    raw.index = pd.to_datetime(raw.index).tz_localize(None)
+    closes = _field(raw, "Adj Close", tickers)
+    closes = closes if closes is not None else _field(raw, "Close", tickers)
+    actions = {}
+    for name in ("Stock Splits", "Dividends"):
+        events = _field(raw, name, tickers)
+        if events is None:
+            continue
+        for ticker in events.columns:
+            days = events.index[events[ticker].fillna(0) != 0]
+            if len(days):
+                actions[ticker] = max(actions.get(ticker, days[-1]), days[-1])
+    return closes, {t: d.date().isoformat() for t, d in actions.items()}
+
+
+def _restate(tickers, coverage, prices):
+    """
+    Re-download the whole stored range of tickers after a split or
+    dividend, which changes every adjusted close before it.
+    """
+    for ticker in tickers:
+        cov = coverage[ticker]
+        try:
+            fetched, _ = _download([ticker], date.fromisoformat(cov["from"]), date.fromisoformat(cov["to"]))
+        except Exception:
+            continue  # keep the old history until the next action
+        if fetched.empty:
+            continue
+        if ticker in prices.columns:
+            prices = prices.drop(columns=ticker)
+        prices = fetched.combine_first(prices) if not prices.empty else fetched
+        cov["fetched_at"] = time.time()
+    return prices
+
+
+def update(tickers, start, end):
+    """
+    Make sure tickers have daily bars for [start, end), fetching only the
+    missing ranges. Tickers missing the same range share one download.
+    A split or dividend in a fetched range re-downloads that ticker's whole
+    history, since the adjusted closes before it all change.
+    No-op in read-only mode, where refresh_worker.py does the fetching.
+    """
+    if disk_cache.READ_ONLY:
+        return
+    today = date.today()
+    with _lock:
+        coverage = _read_coverage()
+        jobs = defaultdict(list)
+        for ticker in tickers:
+            for rng in _missing_ranges(coverage.get(ticker), start, end, today):
+                jobs[rng].append(ticker)
+        if not jobs:
+            return
+
+        prices = load()
+        fetched_any = merged = False
+        restate = set()
+        for (rng_start, rng_end), group in jobs.items():
+            try:
+                fetched, actions = _download(group, rng_start, rng_end)
+            except Exception:
+                continue  # leave coverage as-is; retried on the next update
+            fetched_any = True
+            # An empty range (weekend, holiday, before the open) still counts
+            # as fetched, so it isn't asked for again until TAIL_TTL passes
+            if not fetched.empty:
+                prices = fetched.combine_first(prices) if not prices.empty else fetched
+                merged = True
+            for ticker in group:
+                cov = coverage.get(ticker) or {}
+                action, adjusted_for = actions.get(ticker, ""), cov.get("adjusted_for", "")
+                # A new split or dividend re-adjusts every stored bar before this range
+                if cov and action > adjusted_for and cov["from"] < rng_start.isoformat():
+                    restate.add(ticker)
+                coverage[ticker] = {
+                    "from": min(rng_start.isoformat(), cov.get("from", rng_start.isoformat())),
+                    "to": max(rng_end.isoformat(), cov.get("to", rng_end.isoformat())),
+                    "fetched_at": time.time(),
+                    "adjusted_for": max(action, adjusted_for),  # newest action the history reflects
+                }
+        if restate:
+            prices = _restate(sorted(restate), coverage, prices)
+        if merged or restate:
+            _write_prices(prices.sort_index())  # only real new bars change version()
+        if fetched_any:
+            _write_coverage(coverage)
+
+
+def version():
+    """Changes whenever the stored prices do; use it to key anything derived from them."""
+    try:
+        return os.stat(PRICES_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def window_version(ticker, start, end):
+    """
+    Changes whenever ticker's bars in the inclusive window [start, end] do
+    (a new bar, or today's bar moving), but not when other days change.
+    Use it to key anything derived from one window.
+    """
+    prices = load()
+    if ticker not in prices.columns:
+        return None
+    bars = prices[ticker].loc[pd.Timestamp(start):pd.Timestamp(end)].dropna()
+    if bars.empty:
+        return 0, None, None
+    return len(bars), bars.index[-1], float(bars.iloc[-1])
+
+
+def window(tickers, start, end):
+    """Slice stored prices for tickers to the inclusive window [start, end]."""
+    prices = load()
+    cols = [t for t in tickers if t in prices.columns]
+    return prices.loc[pd.Timestamp(start):pd.Timestamp(end), cols]
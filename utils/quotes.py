@@ -0,0 +1,172 @@
+"""
+Process-wide quote snapshot.
+
+One background thread per ticker set refreshes last price and previous
+close with a single batched yf.download on a fixed cadence. Every session
+reads from the same lock-protected snapshot, so upstream load no longer
+grows with the number of open dashboards.
+
+With stream=True the snapshot also subscribes to Yahoo's websocket feed
+and applies each trade as it arrives; whenever the socket can't connect
+or drops, it falls back to polling until it reconnects. A watchdog covers
+sockets that go silent without dropping: with no trade for an interval it
+closes the socket during market hours (likely half-open) and otherwise
+polls alongside it.
+
+Each polled refresh is also written to the disk cache. In read-only mode
+the snapshot reloads from there (kept fresh by refresh_worker.py) instead
+of calling Yahoo.
+"""
+import threading
+import time
+from datetime import datetime, time as clock
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from utils import disk_cache, metrics, outbound
+
+DEFAULT_INTERVAL = 60  # seconds
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN, MARKET_CLOSE = clock(9, 30), clock(16, 0)
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+class QuoteSnapshot:
+    def __init__(self, tickers, interval=DEFAULT_INTERVAL, stream=False):
+        self.tickers = tuple(tickers)
+        self.interval = interval
+        self.stream = stream
+        self.streaming = False
+        self.updated_at = None
+        self._last_message = None
+        self._quotes = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def cache_key(self):
+        return "quotes:" + ",".join(self.tickers)
+
+    def refresh(self):
+        """Update the snapshot (from Yahoo, or from disk in read-only mode)."""
+        if disk_cache.READ_ONLY:
+            quotes, _ = disk_cache.get(self.cache_key)
+        else:
+            quotes = self.fetch()
+            disk_cache.put(self.cache_key, quotes, self.interval * 5)
+        with self._lock:
+            self._quotes.update(quotes or {})
+            self.updated_at = time.time()
+
+    def fetch(self):
+        """Fetch last/previous close for every ticker in one request."""
+        with metrics.track("yfinance", "quotes") as call:
+            raw = outbound.yf_download(
+                ("quotes", self.tickers), self.tickers,
+                period="5d", interval="1d", group_by="column", auto_adjust=False
+            )
+            call.frame(raw)
+        if isinstance(raw.columns, pd.MultiIndex):
+            closes = raw["Close"]
+        else:
+            closes = raw[["Close"]].set_axis(list(self.tickers), axis=1)
+        quotes = {}
+        for ticker in self.tickers:
+            if ticker not in closes.columns:
+                continue
+            series = closes[ticker].dropna()
+            if len(series) >= 2:
+                quotes[ticker] = {
+                    "lastPrice": float(series.iloc[-1]),
+                    "previousClose": float(series.iloc[-2]),
+                }
+        return quotes
+
+    def _on_message(self, message):
+        ticker, price = message.get("id"), message.get("price")
+        if ticker not in self.tickers or not price:
+            return
+        with self._lock:
+            quote = self._quotes.setdefault(ticker, {})
+            quote["lastPrice"] = float(price)
+            if message.get("previous_close"):
+                quote["previousClose"] = float(message["previous_close"])
+            self.updated_at = self._last_message = time.time()
+
+    def _listen(self):
+        """Apply websocket trades until the connection ends."""
+        import yfinance as yf
+
+        ws = yf.WebSocket(verbose=False)
+        stop = threading.Event()
+        try:
+            ws.subscribe(list(self.tickers))
+            self.streaming = True
+            self._last_message = time.time()
+            threading.Thread(target=self._watch, args=(ws, stop), name="quote-watchdog", daemon=True).start()
+            ws.listen(self._on_message)
+        finally:
+            stop.set()
+            self.streaming = False
+            ws.close()
+
+    def _watch(self, ws, stop):
+        """While listening: act on a socket that has been silent for an interval."""
+        while not stop.wait(self.interval):
+            if time.time() - self._last_message <= self.interval:
+                continue
+            if market_open():
+                ws.close()  # ends listen(), so _run polls and reconnects
+                return
+            try:
+                self.refresh()  # no trades after hours; keep the closes current
+            except Exception:
+                pass
+
+    def _run(self):
+        while True:
+            if self.stream and not disk_cache.READ_ONLY:
+                try:
+                    self._listen()
+                except Exception:
+                    pass  # poll below, then reconnect
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                pass  # keep serving the last good snapshot
+
+    def start(self):
+        # Fill synchronously once so the first reader has data
+        try:
+            self.refresh()
+        except Exception:
+            pass
+        self._thread = threading.Thread(target=self._run, name="quote-snapshot", daemon=True)
+        self._thread.start()
+
+    def get(self, ticker):
+        """Return {"lastPrice", "previousClose"} for ticker, or None."""
+        with self._lock:
+            quote = self._quotes.get(ticker)
+            return dict(quote) if quote else None
+
+
+def market_open(now=None):
+    """True during regular NYSE hours (weekdays 9:30–16:00 New York; holidays not excluded)."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def get_snapshot(tickers, interval=DEFAULT_INTERVAL, stream=False):
+    """Return the shared, already-running snapshot for this ticker set."""
+    key = (tuple(tickers), interval, stream)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = _snapshots[key] = QuoteSnapshot(tickers, interval, stream)
+            snapshot.start()
+    return snapshot
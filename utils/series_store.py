@@ -0,0 +1,191 @@
+"""
+Local FRED series store.
+
+Observations are kept per series in SQLite together with the last
+observation date seen. A sync asks FRED for observations from a short
+revision window before that date onwards (recent values, e.g. BLS metro
+rates, are revised after release; overlapping rows are replaced), and
+only once a new observation could plausibly have been released (see
+fred.observation_ttl). Pages read stored history from
+here instead of calling FRED.
+"""
+import threading
+import time
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+
+import pandas as pd
+
+from utils import disk_cache, fred
+from utils.disk_cache import CACHE_DIR
+
+STORE_PATH = CACHE_DIR / "series.sqlite3"
+DEFAULT_START = "2015-01-01"  # first sync of a new series starts here
+REVISION_WINDOW = timedelta(days=92)  # about 3 monthly periods re-fetched on every sync
+
+_init_lock = threading.Lock()
+_initialized = False
+_syncing = set()
+_syncing_lock = threading.Lock()
+_writes = 0  # appends made by this process
+
+
+def _connect():
+    global _initialized
+    conn = sqlite3.connect(STORE_PATH, timeout=30)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.executescript("""
+                    PRAGMA journal_mode=WAL;
+                    CREATE TABLE IF NOT EXISTS observations (
+                        series_id TEXT NOT NULL, date TEXT NOT NULL, value REAL NOT NULL,
+                        PRIMARY KEY (series_id, date)
+                    ) WITHOUT ROWID;
+                    CREATE TABLE IF NOT EXISTS series (
+                        series_id TEXT PRIMARY KEY, last_date TEXT NOT NULL, next_check REAL NOT NULL
+                    );
+                """)
+                _initialized = True
+    return conn
+
+
+def _series_state(series_ids):
+    """Return {series_id: (last_date, next_check)} for series already stored."""
+    if not series_ids:
+        return {}
+    marks = ",".join("?" * len(series_ids))
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            f"SELECT series_id, last_date, next_check FROM series WHERE series_id IN ({marks})",
+            list(series_ids)
+        ).fetchall()
+    return {sid: (last_date, next_check) for sid, last_date, next_check in rows}
+
+
+def _append(series_id, observations):
+    """Store observations (replacing revised ones) and schedule the next check for series_id."""
+    rows = []
+    for o in observations:
+        try:
+            rows.append((series_id, o["date"], float(o["value"])))
+        except (KeyError, ValueError):
+            continue  # FRED uses "." for missing values
+    global _writes
+    with closing(_connect()) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?)", rows)
+        tail = conn.execute(
+            "SELECT date FROM observations WHERE series_id = ? ORDER BY date DESC LIMIT 3",
+            (series_id,)
+        ).fetchall()
+        if not tail:
+            return  # nothing stored yet; try again on the next sync
+        ttl = fred.observation_ttl([{"date": d} for (d,) in tail])
+        conn.execute(
+            "INSERT OR REPLACE INTO series VALUES (?, ?, ?)",
+            (series_id, tail[0][0], time.time() + ttl)
+        )
+    _writes += 1
+
+
+def sync(series_ids, api_key, start=DEFAULT_START):
+    """
+    Fetch observations newer than what is stored, plus the last
+    REVISION_WINDOW of stored ones to pick up revisions, for every series
+    in series_ids that is due, concurrently.
+    """
+    state = _series_state(series_ids)
+    now = time.time()
+    params = {}
+    for sid in series_ids:
+        if sid not in state:
+            params[sid] = {"observation_start": start}
+        elif state[sid][1] <= now:
+            revise_from = date.fromisoformat(state[sid][0]) - REVISION_WINDOW
+            params[sid] = {"observation_start": revise_from.isoformat()}
+    for sid, observations in fred.fetch_many(params, api_key).items():
+        _append(sid, observations)
+
+
+def _sync_in_background(series_ids, api_key, start):
+    with _syncing_lock:
+        series_ids = [sid for sid in series_ids if sid not in _syncing]
+        _syncing.update(series_ids)
+    if not series_ids:
+        return
+
+    def run():
+        try:
+            sync(series_ids, api_key, start)
+        except Exception:
+            pass  # keep serving what is stored
+        finally:
+            with _syncing_lock:
+                _syncing.difference_update(series_ids)
+
+    threading.Thread(target=run, name="series-sync", daemon=True).start()
+
+
+def ensure(series_ids, api_key, start=DEFAULT_START):
+    """
+    Make series_ids readable from the store.
+
+    Series never synced before are fetched now; stored series that are due
+    are refreshed on a background thread while the stored rows are served.
+    No-op in read-only mode, where refresh_worker.py does the syncing.
+    """
+    if disk_cache.READ_ONLY:
+        return
+    state = _series_state(series_ids)
+    missing = [sid for sid in series_ids if sid not in state]
+    due = [sid for sid in series_ids if sid in state and state[sid][1] <= time.time()]
+    if missing:
+        sync(missing, api_key, start)
+    if due:
+        _sync_in_background(due, api_key, start)
+
+
+def stored_series():
+    """Ids of every series with stored observations."""
+    with closing(_connect()) as conn:
+        return [sid for (sid,) in conn.execute("SELECT series_id FROM series ORDER BY series_id")]
+
+
+def write_count():
+    """Appends made by this process; a cheap in-memory hint that version() changed."""
+    return _writes
+
+
+def version():
+    """Changes whenever a sync stores anything; use it to key anything derived from the store."""
+    with closing(_connect()) as conn:
+        return conn.execute("SELECT COUNT(*), MAX(last_date), MAX(next_check) FROM series").fetchone()
+
+
+def history(series_ids, start=None):
+    """Return stored observations as a long DataFrame[series_id, date, value]."""
+    if not series_ids:
+        return pd.DataFrame(columns=["series_id", "date", "value"])
+    marks = ",".join("?" * len(series_ids))
+    query = f"SELECT series_id, date, value FROM observations WHERE series_id IN ({marks})"
+    params = list(series_ids)
+    if start is not None:
+        query += " AND date >= ?"
+        params.append(str(start))
+    with closing(_connect()) as conn:
+        df = pd.read_sql_query(query + " ORDER BY series_id, date", conn, params=params)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def series(series_id, start=None):
+    """Return one stored series as DataFrame[date, value], oldest first."""
+    return history([series_id], start)[["date", "value"]].reset_index(drop=True)
+
+
+def panel(series_ids, start=None):
+    """Return stored series as one wide frame (date index x series_id)."""
+    df = history(series_ids, start)
+    wide = df.pivot(index="date", columns="series_id", values="value")
+    return wide.reindex(columns=list(series_ids)).sort_index()